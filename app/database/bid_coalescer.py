@@ -0,0 +1,262 @@
+import asyncio
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+
+import app.database.crud as crud
+import app.database.sql_models as sql_models
+import app.models.py_schemas as py_schemas
+from app.database.database import SessionLocal
+from app.utils.audit import BID_PLACED, OPERATION_CLOSED, AuditLog, audit_log
+from app.utils.invalidation import BID, OPERATION, invalidation_bus
+from app.utils.operations_index import operations_index
+
+
+# ======================================================
+#       AGRUPACIÓN DE OFERTAS POR OPERACIÓN (GROUP COMMIT)
+# ======================================================
+# Con muchas ofertas simultáneas sobre una misma operación, cada una espera el
+# bloqueo de la fila en `operations` y paga su propio commit. El coalescer junta
+# las ofertas que llegan dentro de una ventana corta (o hasta N ofertas), las
+# valida en orden contra el `amount_collected` acumulado y las confirma con un
+# único INSERT multi-fila, un único UPDATE y un único commit. Cada petición
+# recibe su propio resultado (la oferta creada o el error de validación).
+
+BID_BATCH_WINDOW_SECONDS = float(os.environ.get("BID_BATCH_WINDOW_SECONDS", "0.002"))
+BID_BATCH_MAX_SIZE = int(os.environ.get("BID_BATCH_MAX_SIZE", "64"))
+
+
+@dataclass
+class PendingBid:
+    investor_id: str
+    amount: Decimal
+    interest_rate: float
+    future: asyncio.Future = field(repr=False)
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def _reject(pending: PendingBid, error: Exception) -> None:
+    # La petición pudo cancelarse (cliente desconectado) mientras esperaba
+    if not pending.future.done():
+        pending.future.set_exception(error)
+
+
+class BidCoalescer:
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        window: float = BID_BATCH_WINDOW_SECONDS,
+        max_batch: int = BID_BATCH_MAX_SIZE,
+        audit: Optional[AuditLog] = None,
+    ):
+        self.session_factory = session_factory
+        self.audit = audit
+        self.window = window
+        self.max_batch = max_batch
+        self.pending: Dict[int, List[PendingBid]] = {}
+        self.flushers: Dict[int, asyncio.Task] = {}
+        self.wakeups: Dict[int, asyncio.Event] = {}
+
+    async def submit(
+        self,
+        operation_id: int,
+        investor_id: str,
+        amount: Decimal,
+        interest_rate: float,
+    ) -> py_schemas.BidResponse:
+        future = asyncio.get_running_loop().create_future()
+        batch = self.pending.setdefault(operation_id, [])
+        batch.append(
+            PendingBid(str(investor_id), Decimal(str(amount)), interest_rate, future)
+        )
+
+        # Un único flusher por operación; si el lote se llena se despierta antes
+        if operation_id not in self.flushers:
+            self.wakeups[operation_id] = asyncio.Event()
+            self.flushers[operation_id] = asyncio.create_task(self._run(operation_id))
+        elif len(batch) >= self.max_batch:
+            self.wakeups[operation_id].set()
+
+        return await future
+
+    async def _run(self, operation_id: int) -> None:
+        try:
+            while self.pending.get(operation_id):
+                wakeup = self.wakeups[operation_id]
+                if len(self.pending[operation_id]) < self.max_batch:
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), timeout=self.window)
+                    except asyncio.TimeoutError:
+                        pass
+                wakeup.clear()
+
+                # Las ofertas que lleguen durante el commit forman el siguiente lote
+                queued = self.pending.pop(operation_id)
+                batch = queued[: self.max_batch]
+                if len(queued) > self.max_batch:
+                    self.pending[operation_id] = queued[self.max_batch :]
+
+                try:
+                    await self._commit_batch(operation_id, batch)
+                except Exception as e:
+                    for pending in batch:
+                        _reject(pending, e)
+        finally:
+            del self.flushers[operation_id]
+            del self.wakeups[operation_id]
+
+    async def _commit_batch(self, operation_id: int, batch: List[PendingBid]) -> None:
+        async with self.session_factory() as db:
+            try:
+                # Bloquea la fila de la operación una sola vez para todo el lote
+                result = await db.execute(
+                    select(sql_models.Operation)
+                    .where(sql_models.Operation.id == operation_id)
+                    .with_for_update()
+                )
+                operation = result.scalar_one_or_none()
+                if operation is None:
+                    error = HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Operation not found.",
+                    )
+                    for pending in batch:
+                        _reject(pending, error)
+                    return
+
+                result = await db.execute(
+                    select(sql_models.Bid.investor_id).where(
+                        sql_models.Bid.operation_id == operation_id,
+                        sql_models.Bid.investor_id.in_(
+                            {pending.investor_id for pending in batch}
+                        ),
+                    )
+                )
+                investors_with_bid = set(result.scalars().all())
+
+                # Validación en orden de llegada contra el monto acumulado
+                now = datetime.now(timezone.utc)
+                amount_required = Decimal(operation.amount_required)
+                amount_collected = Decimal(operation.amount_collected or 0)
+                initial_collected = amount_collected
+                is_closed = bool(operation.is_closed)
+                accepted: List[PendingBid] = []
+
+                for pending in batch:
+                    if pending.future.done():
+                        continue
+                    if is_closed:
+                        error = _bad_request("Operation is closed")
+                    elif now.date() > operation.deadline:
+                        error = _bad_request("Operation expired by date and time")
+                    elif pending.investor_id in investors_with_bid:
+                        error = _bad_request("User has already bid this operation")
+                    elif pending.amount <= 0:
+                        error = _bad_request(
+                            "Amount of the bid must be greater than zero"
+                        )
+                    elif amount_required < pending.amount + amount_collected:
+                        error = _bad_request("Amount of the bid exceeds the value")
+                    else:
+                        error = None
+
+                    if error is not None:
+                        _reject(pending, error)
+                        continue
+
+                    accepted.append(pending)
+                    investors_with_bid.add(pending.investor_id)
+                    amount_collected += pending.amount
+                    is_closed = amount_collected == amount_required
+
+                if not accepted:
+                    await db.rollback()
+                    return
+
+                # Un INSERT multi-fila, un UPDATE y un commit para todo el lote
+                await db.execute(
+                    insert(sql_models.Bid).values(
+                        [
+                            {
+                                "operation_id": operation_id,
+                                "investor_id": pending.investor_id,
+                                "amount": pending.amount,
+                                "interest_rate": pending.interest_rate,
+                                "bid_date": now,
+                            }
+                            for pending in accepted
+                        ]
+                    )
+                )
+                await db.execute(
+                    update(sql_models.Operation)
+                    .where(sql_models.Operation.id == operation_id)
+                    .values(amount_collected=amount_collected, is_closed=is_closed)
+                )
+                await crud.add_to_operator_summary(
+                    db,
+                    operation.operator_id,
+                    len(accepted),
+                    amount_collected - initial_collected,
+                    int(is_closed),
+                )
+
+                # Recupera los ids generados (MySQL no soporta RETURNING)
+                result = await db.execute(
+                    select(sql_models.Bid).where(
+                        sql_models.Bid.operation_id == operation_id,
+                        sql_models.Bid.investor_id.in_(
+                            [pending.investor_id for pending in accepted]
+                        ),
+                    )
+                )
+                created = {
+                    bid.investor_id: py_schemas.BidResponse.model_validate(bid)
+                    for bid in result.scalars().all()
+                }
+                await db.commit()
+                operations_index.update_funding(
+                    operation_id, amount_collected, is_closed
+                )
+                invalidation_bus.publish(OPERATION, operation_id)
+                for bid in created.values():
+                    invalidation_bus.publish(BID, bid.id)
+
+            except SQLAlchemyError as e:
+                print(f"Error committing the bid batch: {str(e)}")
+                await db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Database error: {e}.",
+                )
+
+        for pending in accepted:
+            if not pending.future.done():
+                pending.future.set_result(created[pending.investor_id])
+
+        # Los eventos de auditoría se encolan después de responder
+        if self.audit is not None:
+            for pending in accepted:
+                bid = created[pending.investor_id]
+                await self.audit.record(
+                    BID_PLACED,
+                    operation_id,
+                    bid_id=bid.id,
+                    actor_id=bid.investor_id,
+                    amount=bid.amount,
+                )
+            if is_closed:
+                await self.audit.record(OPERATION_CLOSED, operation_id)
+
+
+bid_coalescer = BidCoalescer(audit=audit_log)
@@ -1,16 +1,20 @@
+import os
 from datetime import datetime, timezone
-from sqlalchemy import select, update
+from sqlalchemy import delete, insert, lambda_stmt, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
-from sqlalchemy import String, and_
+from typing import List, Optional, Tuple
+from sqlalchemy import String, and_, case
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql.elements import ColumnElement
 from sqlalchemy.sql import func
 import uuid
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from fastapi import HTTPException, status
 from decimal import Decimal
 
 import app.database.sql_models as sql_models
 import app.models.py_schemas as py_schemas
+from app.utils.invalidation import BID, OPERATION, USER, invalidation_bus
 
 from passlib.context import CryptContext
 
@@ -43,6 +47,7 @@ async def create_user(db: AsyncSession, data: py_schemas.UserCreate) -> py_schem
         db.add(new_user)
         await db.commit()
         await db.refresh(new_user)
+        invalidation_bus.publish(USER, new_user.id)
         return py_schemas.User.model_validate(new_user)
     except SQLAlchemyError as e:
         print(f"Error creating user: {str(e)}")
@@ -69,8 +74,11 @@ async def create_operation(
             created_at=datetime.now(timezone.utc),
         )
         db.add(new_operation)
+        await db.flush()
+        await refresh_operator_summaries(db, [current_user.id])
         await db.commit()
         await db.refresh(new_operation)
+        invalidation_bus.publish(OPERATION, new_operation.id)
         return new_operation
     except SQLAlchemyError as e:
         print(f"Error creating the operation: {str(e)}")
@@ -97,6 +105,8 @@ async def create_bid(
         db.add(new_bid)
         await db.commit()
         await db.refresh(new_bid)
+        invalidation_bus.publish(BID, new_bid.id)
+        invalidation_bus.publish(OPERATION, new_bid.operation_id)
         return new_bid
     except SQLAlchemyError as e:
         print(f"Error creating the bid: {str(e)}")
@@ -106,6 +116,21 @@ async def create_bid(
         )
 
 
+# Tabla de claves de idempotencia
+
+
+async def create_idempotency_record(
+    db: AsyncSession, record: sql_models.IdempotencyKey
+) -> None:
+    try:
+        # Si otro proceso ya guardó la misma clave falla la PK y se conserva la primera
+        db.add(record)
+        await db.commit()
+    except SQLAlchemyError as e:
+        print(f"Error storing idempotency key: {str(e)}")
+        await db.rollback()
+
+
 # ======================================================
 #                        READ
 # ======================================================
@@ -132,8 +157,13 @@ async def get_user_by_username(
     db: AsyncSession, username: str
 ) -> Optional[py_schemas.User]:
     try:
+        # Sentencia cacheada: se construye y compila una sola vez, `username` va como parámetro
         result = await db.execute(
-            select(sql_models.User).filter(sql_models.User.username == username)
+            lambda_stmt(
+                lambda: select(sql_models.User).where(
+                    sql_models.User.username == username
+                )
+            )
         )
         return result.scalars().first()
     except SQLAlchemyError as e:
@@ -152,7 +182,11 @@ async def get_operation_by_id(
 ) -> Optional[py_schemas.Operation]:
     try:
         result = await db.execute(
-            select(sql_models.Operation).filter(sql_models.Operation.id == operation_id)
+            lambda_stmt(
+                lambda: select(sql_models.Operation).where(
+                    sql_models.Operation.id == operation_id
+                )
+            )
         )
         return result.scalars().first()
     except SQLAlchemyError as e:
@@ -163,6 +197,28 @@ async def get_operation_by_id(
         )
 
 
+async def get_operation_with_access(
+    db: AsyncSession, operation_id: int, policy: ColumnElement[bool]
+) -> Optional[Tuple[sql_models.Operation, bool]]:
+    # Devuelve la operación junto con el resultado de la política en una sola consulta
+    try:
+        result = await db.execute(
+            select(sql_models.Operation, policy.label("allowed")).where(
+                sql_models.Operation.id == operation_id
+            )
+        )
+        row = result.first()
+        if row is None:
+            return None
+        return row.Operation, bool(row.allowed)
+    except SQLAlchemyError as e:
+        print(f"Error getting operation information: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {e}.",
+        )
+
+
 async def get_active_operations(db: AsyncSession) -> List[sql_models.Operation]:
     try:
         query = select(sql_models.Operation).where(
@@ -181,6 +237,164 @@ async def get_active_operations(db: AsyncSession) -> List[sql_models.Operation]:
         )
 
 
+async def get_operation_with_bids(
+    db: AsyncSession, operation_id: int, policy: ColumnElement[bool]
+) -> Optional[py_schemas.OperationDetail]:
+    # Operación y sus ofertas en dos consultas fijas (operación + selectinload).
+    # La política filtra las ofertas dentro de la propia carga.
+    try:
+        result = await db.execute(
+            select(sql_models.Operation)
+            .options(selectinload(sql_models.Operation.bids.and_(policy)))
+            .where(sql_models.Operation.id == operation_id)
+        )
+        operation = result.scalars().first()
+        if operation is None:
+            return None
+        return py_schemas.OperationDetail(
+            **py_schemas.Operation.model_validate(operation).model_dump(),
+            bids=[
+                py_schemas.Bid.model_validate(bid)
+                for bid in sorted(operation.bids, key=lambda bid: bid.id)
+            ],
+        )
+    except SQLAlchemyError as e:
+        print(f"Error getting operation information: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {e}.",
+        )
+
+
+async def get_active_operations_with_bid_summary(
+    db: AsyncSession,
+) -> List[py_schemas.OperationDetail]:
+    # Lista de operaciones activas con el resumen de sus ofertas en una única
+    # consulta: las ofertas se agregan en una subconsulta unida por LEFT JOIN.
+    try:
+        summary = (
+            select(
+                sql_models.Bid.operation_id,
+                func.count(sql_models.Bid.id).label("bid_count"),
+                func.sum(sql_models.Bid.amount).label("total_amount"),
+                func.avg(sql_models.Bid.interest_rate).label("avg_interest_rate"),
+            )
+            .group_by(sql_models.Bid.operation_id)
+            .subquery()
+        )
+        query = (
+            select(
+                sql_models.Operation,
+                summary.c.bid_count,
+                summary.c.total_amount,
+                summary.c.avg_interest_rate,
+            )
+            .outerjoin(summary, summary.c.operation_id == sql_models.Operation.id)
+            .where(
+                sql_models.Operation.is_closed == False,
+                sql_models.Operation.deadline > datetime.now(timezone.utc),
+            )
+            .order_by(sql_models.Operation.id)
+        )
+        result = await db.execute(query)
+        return [
+            py_schemas.OperationDetail(
+                **py_schemas.Operation.model_validate(row.Operation).model_dump(),
+                bid_summary=py_schemas.BidSummary(
+                    bid_count=row.bid_count or 0,
+                    total_amount=row.total_amount or 0,
+                    avg_interest_rate=row.avg_interest_rate,
+                ),
+            )
+            for row in result
+        ]
+    except SQLAlchemyError as e:
+        print(f"Error getting operation information: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {e}.",
+        )
+
+
+def _operator_summary(summary) -> py_schemas.OperatorSummary:
+    if summary is None:
+        return py_schemas.OperatorSummary()
+    required = float(summary.amount_required_total or 0)
+    collected = float(summary.amount_collected_total or 0)
+    return py_schemas.OperatorSummary(
+        operation_count=summary.operation_count,
+        open_operation_count=summary.open_operation_count,
+        amount_required_total=required,
+        amount_collected_total=collected,
+        bid_count=summary.bid_count,
+        fill_ratio=collected / required if required else 0.0,
+    )
+
+
+async def get_operator_dashboard(
+    db: AsyncSession, operator_id: str, offset: int = 0, limit: Optional[int] = None
+) -> py_schemas.OperatorDashboard:
+    # Una consulta sobre el índice (operator_id, is_closed, deadline): la página de
+    # operaciones (abiertas primero, por fecha límite) con su número de ofertas y
+    # el resumen materializado del operador unido a cada fila
+    Operation, Bid = sql_models.Operation, sql_models.Bid
+    Summary = sql_models.OperatorSummary
+    try:
+        bid_count = (
+            select(func.count(Bid.id))
+            .where(Bid.operation_id == Operation.id)
+            .correlate(Operation)
+            .scalar_subquery()
+        )
+        query = (
+            select(Operation, bid_count.label("bid_count"), Summary)
+            .outerjoin(Summary, Summary.operator_id == Operation.operator_id)
+            .where(Operation.operator_id == operator_id)
+            .order_by(Operation.is_closed, Operation.deadline, Operation.id)
+            .offset(offset)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        rows = (await db.execute(query)).all()
+
+        today = datetime.now(timezone.utc).date()
+        operations = []
+        for row in rows:
+            operation = py_schemas.Operation.model_validate(row.Operation)
+            operations.append(
+                py_schemas.DashboardOperation(
+                    **operation.model_dump(),
+                    bid_count=row.bid_count,
+                    fill_ratio=(
+                        operation.amount_collected / operation.amount_required
+                        if operation.amount_required
+                        else 0.0
+                    ),
+                    days_to_deadline=(operation.deadline - today).days,
+                )
+            )
+
+        if rows and rows[0].OperatorSummary is not None:
+            summary = rows[0].OperatorSummary
+        else:
+            # Página vacía o resumen aún no materializado (datos previos): se recalcula
+            if rows:
+                await refresh_operator_summaries(db, [operator_id])
+                await db.commit()
+            summary = await db.get(Summary, operator_id, populate_existing=True)
+
+        return py_schemas.OperatorDashboard(
+            summary=_operator_summary(summary), operations=operations
+        )
+    except SQLAlchemyError as e:
+        print(f"Error getting operation information: {str(e)}")
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {e}.",
+        )
+
+
 # Tabla de ofertas
 
 
@@ -198,13 +412,45 @@ async def get_bid_by_id(db: AsyncSession, bid_id: int) -> Optional[py_schemas.Bi
         )
 
 
+async def get_bid_with_access(
+    db: AsyncSession, bid_id: int, policy: ColumnElement[bool]
+) -> Optional[Tuple[sql_models.Bid, bool]]:
+    # Devuelve la oferta junto con el resultado de la política en una sola consulta
+    try:
+        result = await db.execute(
+            select(sql_models.Bid, policy.label("allowed")).where(
+                sql_models.Bid.id == bid_id
+            )
+        )
+        row = result.first()
+        if row is None:
+            return None
+        return row.Bid, bool(row.allowed)
+    except SQLAlchemyError as e:
+        print(f"Error getting bid information: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {e}.",
+        )
+
+
 async def get_bids_by_operation_id(
-    db: AsyncSession, operation_id: int
+    db: AsyncSession,
+    operation_id: int,
+    policy: Optional[ColumnElement[bool]] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
 ) -> Optional[List[py_schemas.Bid]]:
     try:
         query = select(sql_models.Bid).filter(
             sql_models.Bid.operation_id == operation_id
         )
+        # La política se evalúa en la misma consulta que trae la página
+        if policy is not None:
+            query = query.where(policy)
+        query = query.order_by(sql_models.Bid.id).offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
         result = await db.execute(query)
         bids = result.scalars().all()
         return bids
@@ -216,13 +462,100 @@ async def get_bids_by_operation_id(
         )
 
 
+async def get_operation_bids_access(
+    db: AsyncSession, operation_id: int, policy: ColumnElement[bool]
+) -> Tuple[bool, bool]:
+    # Indica (existen ofertas, el usuario puede verlas) con dos EXISTS en una consulta.
+    # Solo se usa cuando la página viene vacía, para distinguir 404 de 403.
+    try:
+        operation_bids = select(sql_models.Bid.id).where(
+            sql_models.Bid.operation_id == operation_id
+        )
+        result = await db.execute(
+            select(
+                operation_bids.exists().label("has_bids"),
+                operation_bids.where(policy).exists().label("allowed"),
+            )
+        )
+        row = result.one()
+        return bool(row.has_bids), bool(row.allowed)
+    except SQLAlchemyError as e:
+        print(f"Error getting bid information: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {e}.",
+        )
+
+
+async def get_investor_portfolio(
+    db: AsyncSession, investor_id: str, offset: int = 0, limit: Optional[int] = None
+) -> py_schemas.Portfolio:
+    # Cartera del inversor en dos consultas sobre el índice (investor_id, bid_date):
+    # una página de ofertas con el estado de su operación y los totales agregados
+    try:
+        Bid, Operation = sql_models.Bid, sql_models.Operation
+
+        query = (
+            select(Bid, Operation.is_closed, Operation.deadline)
+            .join(Operation, Operation.id == Bid.operation_id)
+            .where(Bid.investor_id == investor_id)
+            .order_by(Bid.bid_date.desc(), Bid.id.desc())
+            .offset(offset)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        result = await db.execute(query)
+        bids = [
+            py_schemas.PortfolioBid(
+                **py_schemas.BidResponse.model_validate(row.Bid).model_dump(),
+                operation_is_closed=bool(row.is_closed),
+                operation_deadline=row.deadline,
+            )
+            for row in result
+        ]
+
+        committed = func.sum(Bid.amount)
+        result = await db.execute(
+            select(
+                func.count(Bid.id).label("bid_count"),
+                committed.label("committed_amount"),
+                (
+                    func.sum(Bid.amount * Bid.interest_rate) / func.nullif(committed, 0)
+                ).label("weighted_interest_rate"),
+                func.sum(
+                    case((Operation.is_closed == True, 0), else_=Bid.amount)
+                ).label("open_amount"),
+                func.sum(
+                    case((Operation.is_closed == True, Bid.amount), else_=0)
+                ).label("closed_amount"),
+            )
+            .join(Operation, Operation.id == Bid.operation_id)
+            .where(Bid.investor_id == investor_id)
+        )
+        row = result.one()
+        totals = py_schemas.PortfolioTotals(
+            bid_count=row.bid_count,
+            committed_amount=row.committed_amount or 0,
+            weighted_interest_rate=row.weighted_interest_rate,
+            open_amount=row.open_amount or 0,
+            closed_amount=row.closed_amount or 0,
+        )
+        return py_schemas.Portfolio(totals=totals, bids=bids)
+    except SQLAlchemyError as e:
+        print(f"Error getting bid information: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {e}.",
+        )
+
+
 async def get_bid_by_investor_and_operation(
     db: AsyncSession, investor_id: int, operation_id: int
 ):
     try:
         result = await db.execute(
-            select(sql_models.Bid).where(
-                and_(
+            lambda_stmt(
+                lambda: select(sql_models.Bid).where(
                     sql_models.Bid.investor_id == investor_id,
                     sql_models.Bid.operation_id == operation_id,
                 )
@@ -237,27 +570,152 @@ async def get_bid_by_investor_and_operation(
         )
 
 
+# Tabla de claves de idempotencia
+
+
+async def get_idempotency_record(
+    db: AsyncSession, key: str
+) -> Optional[sql_models.IdempotencyKey]:
+    try:
+        result = await db.execute(
+            select(sql_models.IdempotencyKey).where(
+                sql_models.IdempotencyKey.key == key,
+                sql_models.IdempotencyKey.expires_at > datetime.now(timezone.utc),
+            )
+        )
+        return result.scalars().first()
+    except SQLAlchemyError as e:
+        print(f"Error getting idempotency key: {str(e)}")
+        return None
+
+
 # ======================================================
 #                       DELETE
 # ======================================================
 
 
+# Borrado por lotes: se recorren los ids de las ofertas afectadas por tramos
+# (keyset) y cada tramo se elimina con un DELETE por rango y su propio commit.
+# Python no carga las filas; el coste crece con el número de sentencias.
+DELETE_CHUNK_SIZE = int(os.environ.get("DELETE_CHUNK_SIZE", "5000"))
+
+
+async def _delete_bids_in_chunks(
+    db: AsyncSession,
+    criteria: ColumnElement[bool],
+    release_amounts: bool = False,
+    chunk_size: Optional[int] = None,
+) -> int:
+    chunk_size = chunk_size or DELETE_CHUNK_SIZE
+    deleted = 0
+    last_id = None
+    while True:
+        chunk = [criteria]
+        if last_id is not None:
+            chunk.append(sql_models.Bid.id > last_id)
+
+        # Id de la última oferta del tramo (None si quedan menos de chunk_size)
+        result = await db.execute(
+            select(sql_models.Bid.id)
+            .where(*chunk)
+            .order_by(sql_models.Bid.id)
+            .offset(chunk_size - 1)
+            .limit(1)
+        )
+        upper_id = result.scalar()
+        if upper_id is not None:
+            chunk.append(sql_models.Bid.id <= upper_id)
+
+        if release_amounts:
+            # Descuenta de las operaciones abiertas lo aportado por las ofertas del tramo
+            released = (
+                select(func.coalesce(func.sum(sql_models.Bid.amount), 0))
+                .where(sql_models.Bid.operation_id == sql_models.Operation.id, *chunk)
+                .scalar_subquery()
+            )
+            await db.execute(
+                update(sql_models.Operation)
+                .where(
+                    sql_models.Operation.is_closed == False,
+                    sql_models.Operation.id.in_(
+                        select(sql_models.Bid.operation_id).where(*chunk)
+                    ),
+                )
+                .values(
+                    amount_collected=sql_models.Operation.amount_collected - released
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+        result = await db.execute(
+            delete(sql_models.Bid)
+            .where(*chunk)
+            .execution_options(synchronize_session=False)
+        )
+        deleted += result.rowcount
+        await db.commit()
+
+        if upper_id is None:
+            return deleted
+        last_id = upper_id
+
+
 # Tabla de usuarios
 
 
 async def delete_user_by_id(db: AsyncSession, user_id: str) -> bool:
+    # Orden de dependencias: ofertas del usuario (liberando montos de operaciones
+    # abiertas), ofertas sobre sus operaciones, sus operaciones y el usuario
     try:
+        # Operadores cuyas operaciones recibieron ofertas del usuario
         result = await db.execute(
-            select(sql_models.User).filter(sql_models.User.id == user_id)
+            select(sql_models.Operation.operator_id)
+            .distinct()
+            .where(
+                sql_models.Operation.id.in_(
+                    select(sql_models.Bid.operation_id).where(
+                        sql_models.Bid.investor_id == user_id
+                    )
+                )
+            )
+        )
+        affected_operators = set(result.scalars().all())
+
+        # Ofertas realizadas como inversor
+        await _delete_bids_in_chunks(
+            db, sql_models.Bid.investor_id == user_id, release_amounts=True
+        )
+
+        # Operaciones creadas como operador, con todas sus ofertas
+        own_operations = select(sql_models.Operation.id).where(
+            sql_models.Operation.operator_id == user_id
+        )
+        await _delete_bids_in_chunks(
+            db, sql_models.Bid.operation_id.in_(own_operations)
+        )
+        await db.execute(
+            delete(sql_models.Operation)
+            .where(sql_models.Operation.operator_id == user_id)
+            .execution_options(synchronize_session=False)
+        )
+
+        # Sin operaciones su propio resumen desaparece
+        await refresh_operator_summaries(db, affected_operators | {user_id})
+
+        result = await db.execute(
+            delete(sql_models.User)
+            .where(sql_models.User.id == user_id)
+            .execution_options(synchronize_session=False)
         )
-        user = result.scalars().first()
-        if user is None:
-            return False
-        await db.delete(user)
         await db.commit()
-        return True
+        # Puede afectar a muchas operaciones y ofertas: se invalidan completas
+        invalidation_bus.publish(USER, user_id)
+        invalidation_bus.publish(OPERATION)
+        invalidation_bus.publish(BID)
+        return result.rowcount > 0
     except SQLAlchemyError as e:
         print(f"Error deleting user: {str(e)}")
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Database error: {e}.",
@@ -270,16 +728,27 @@ async def delete_user_by_id(db: AsyncSession, user_id: str) -> bool:
 async def delete_operation_by_id(db: AsyncSession, operation_id: int) -> bool:
     try:
         result = await db.execute(
-            select(sql_models.Operation).filter(sql_models.Operation.id == operation_id)
+            select(sql_models.Operation.operator_id).where(
+                sql_models.Operation.id == operation_id
+            )
         )
-        operation = result.scalars().first()
-        if operation is None:
-            return False
-        await db.delete(operation)
+        operator_ids = result.scalars().all()
+
+        # Primero sus ofertas por tramos, luego la operación
+        await _delete_bids_in_chunks(db, sql_models.Bid.operation_id == operation_id)
+        result = await db.execute(
+            delete(sql_models.Operation)
+            .where(sql_models.Operation.id == operation_id)
+            .execution_options(synchronize_session=False)
+        )
+        await refresh_operator_summaries(db, operator_ids)
         await db.commit()
-        return True
+        invalidation_bus.publish(OPERATION, operation_id)
+        invalidation_bus.publish(BID)
+        return result.rowcount > 0
     except SQLAlchemyError as e:
         print(f"Error deleting operation: {str(e)}")
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Database error: {e}.",
@@ -292,16 +761,31 @@ async def delete_operation_by_id(db: AsyncSession, operation_id: int) -> bool:
 async def delete_bid_by_id(db: AsyncSession, bid_id: int) -> bool:
     try:
         result = await db.execute(
-            select(sql_models.Bid).filter(sql_models.Bid.id == bid_id)
+            select(sql_models.Operation.id, sql_models.Operation.operator_id).where(
+                sql_models.Operation.id
+                == select(sql_models.Bid.operation_id)
+                .where(sql_models.Bid.id == bid_id)
+                .scalar_subquery()
+            )
+        )
+        operations = result.all()
+
+        result = await db.execute(
+            delete(sql_models.Bid)
+            .where(sql_models.Bid.id == bid_id)
+            .execution_options(synchronize_session=False)
+        )
+        await refresh_operator_summaries(
+            db, [operator_id for _, operator_id in operations]
         )
-        bid = result.scalars().first()
-        if bid is None:
-            return False
-        await db.delete(bid)
         await db.commit()
-        return True
+        invalidation_bus.publish(BID, bid_id)
+        for operation_id, _ in operations:
+            invalidation_bus.publish(OPERATION, operation_id)
+        return result.rowcount > 0
     except SQLAlchemyError as e:
         print(f"Error deleting bid: {str(e)}")
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Database error: {e}.",
@@ -319,19 +803,70 @@ async def delete_bid_by_id(db: AsyncSession, bid_id: int) -> bool:
 async def update_user_by_id(
     db: AsyncSession, user_id: int, property_name: str, value: str
 ) -> bool:
+    # Un único UPDATE ... WHERE id = :id; el número de filas afectadas indica si existía
+    if property_name not in sql_models.User.__table__.columns:
+        return False
     try:
         result = await db.execute(
-            select(sql_models.User).filter(sql_models.User.id == user_id)
+            update(sql_models.User)
+            .where(sql_models.User.id == user_id)
+            .values({property_name: value})
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        invalidation_bus.publish(USER, user_id)
+        return result.rowcount > 0
+    except SQLAlchemyError as e:
+        print(f"Error updating user information: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {e}.",
+        )
+
+
+async def update_user_fields(
+    db: AsyncSession,
+    user_id: str,
+    data: py_schemas.UserUpdate,
+    policy: ColumnElement[bool],
+) -> Optional[py_schemas.User]:
+    # Aplica todos los campos enviados en un UPDATE con la política en el WHERE.
+    # Devuelve None si no se afectó ninguna fila (no existe o no está permitido).
+    values = data.model_dump(exclude_unset=True)
+    if "password" in values:
+        values["password_hash"] = get_password_hash(values.pop("password"))
+    try:
+        if values:
+            result = await db.execute(
+                update(sql_models.User)
+                .where(sql_models.User.id == user_id, policy)
+                .values(values)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                await db.rollback()
+                return None
+
+        result = await db.execute(
+            select(sql_models.User)
+            .where(sql_models.User.id == user_id, policy)
+            .execution_options(populate_existing=True)
         )
         user = result.scalars().first()
-        if user and hasattr(user, property_name):
-            setattr(user, property_name, value)
-            await db.commit()
-            await db.refresh(user)
-            return True
-        return False
+        user = py_schemas.User.model_validate(user) if user else None
+        await db.commit()
+        if user and values:
+            invalidation_bus.publish(USER, user_id)
+        return user
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This username is already registered.",
+        )
     except SQLAlchemyError as e:
         print(f"Error updating user information: {str(e)}")
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Database error: {e}.",
@@ -344,19 +879,71 @@ async def update_user_by_id(
 async def update_operation_by_id(
     db: AsyncSession, operation_id: int, property_name: str, value: str
 ) -> bool:
+    # Un único UPDATE ... WHERE id = :id; el número de filas afectadas indica si existía
+    if property_name not in sql_models.Operation.__table__.columns:
+        return False
+    try:
+        result = await db.execute(
+            update(sql_models.Operation)
+            .where(sql_models.Operation.id == operation_id)
+            .values({property_name: value})
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        invalidation_bus.publish(OPERATION, operation_id)
+        return result.rowcount > 0
+    except SQLAlchemyError as e:
+        print(f"Error updating operation information: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {e}.",
+        )
+
+
+async def update_operation_fields(
+    db: AsyncSession,
+    operation_id: int,
+    data: py_schemas.OperationUpdate,
+    policy: ColumnElement[bool],
+) -> Optional[py_schemas.Operation]:
+    # Aplica todos los campos enviados en un UPDATE con la política en el WHERE.
+    # Si cambia el monto requerido no puede quedar por debajo de lo ya recaudado.
+    # Devuelve None si no se afectó ninguna fila.
+    values = data.model_dump(exclude_unset=True)
     try:
+        if values:
+            query = update(sql_models.Operation).where(
+                sql_models.Operation.id == operation_id, policy
+            )
+            if "amount_required" in values:
+                query = query.where(
+                    sql_models.Operation.amount_collected <= values["amount_required"]
+                )
+            result = await db.execute(
+                query.values(values).execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                await db.rollback()
+                return None
+
         result = await db.execute(
-            select(sql_models.Operation).filter(sql_models.Operation.id == operation_id)
+            select(sql_models.Operation)
+            .where(sql_models.Operation.id == operation_id, policy)
+            .execution_options(populate_existing=True)
         )
         operation = result.scalars().first()
-        if operation and hasattr(operation, property_name):
-            setattr(operation, property_name, value)
-            await db.commit()
-            await db.refresh(operation)
-            return True
-        return False
+        operation = (
+            py_schemas.Operation.model_validate(operation) if operation else None
+        )
+        if operation and values:
+            await refresh_operator_summaries(db, [operation.operator_id])
+        await db.commit()
+        if operation and values:
+            invalidation_bus.publish(OPERATION, operation_id)
+        return operation
     except SQLAlchemyError as e:
         print(f"Error updating operation information: {str(e)}")
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Database error: {e}.",
@@ -408,7 +995,9 @@ async def update_operation_amount_collected(
                 .values(is_closed=True)
             )
 
+        await refresh_operator_summaries(db, [operation.operator_id])
         await db.commit()
+        invalidation_bus.publish(OPERATION, operation_id)
 
     except SQLAlchemyError as e:
         print(f"Error updating the operation's amount_collected: {str(e)}")
@@ -420,7 +1009,8 @@ async def update_operation_amount_collected(
         raise e
 
 
-async def update_expired_operations(db: AsyncSession) -> bool:
+async def update_expired_operations(db: AsyncSession) -> List[int]:
+    # Cierra las operaciones vencidas y devuelve sus ids
     try:
         result = await db.execute(
             select(sql_models.Operation).where(
@@ -430,13 +1020,21 @@ async def update_expired_operations(db: AsyncSession) -> bool:
         )
 
         expired_operations = result.scalars().all()
+        # Se copian antes de los commits, que expiran los objetos
+        closed = [operation.id for operation in expired_operations]
+        operator_ids = {operation.operator_id for operation in expired_operations}
 
         for operation in expired_operations:
             operation.is_closed = True
             await db.commit()
             await db.refresh(operation)
 
-        return True
+        await refresh_operator_summaries(db, operator_ids)
+        await db.commit()
+        if closed:
+            invalidation_bus.publish(OPERATION)
+
+        return closed
 
     except SQLAlchemyError as e:
         print(f"Error updating expired operations: {str(e)}")
@@ -453,20 +1051,197 @@ async def update_expired_operations(db: AsyncSession) -> bool:
 async def update_bid_by_id(
     db: AsyncSession, bid_id: int, property_name: str, value: str
 ) -> bool:
+    # Un único UPDATE ... WHERE id = :id; el número de filas afectadas indica si existía
+    if property_name not in sql_models.Bid.__table__.columns:
+        return False
     try:
         result = await db.execute(
-            select(sql_models.Bid).filter(sql_models.Bid.id == bid_id)
+            update(sql_models.Bid)
+            .where(sql_models.Bid.id == bid_id)
+            .values({property_name: value})
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        invalidation_bus.publish(BID, bid_id)
+        return result.rowcount > 0
+    except SQLAlchemyError as e:
+        print(f"Error updating bid information: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {e}.",
+        )
+
+
+async def update_bid_fields(
+    db: AsyncSession,
+    bid_id: int,
+    data: py_schemas.BidUpdate,
+    policy: ColumnElement[bool],
+) -> Optional[py_schemas.BidResponse]:
+    # Modifica la oferta en sitio (sin borrarla y volver a crearla). Solo se permite
+    # sobre operaciones abiertas y sin superar el monto requerido. Devuelve None si
+    # alguna condición del WHERE no se cumplió.
+    values = data.model_dump(exclude_unset=True)
+    today = datetime.now(timezone.utc).date()
+    open_operations = select(sql_models.Operation.id).where(
+        sql_models.Operation.is_closed == False,
+        sql_models.Operation.deadline >= today,
+    )
+    try:
+        if "amount" in values:
+            # Ajusta lo recaudado con la diferencia de montos en el mismo UPDATE que
+            # comprueba el tope; bloquea la fila de la operación como al ofertar
+            amount = Decimal(str(values["amount"]))
+            old_amount = (
+                select(sql_models.Bid.amount)
+                .where(sql_models.Bid.id == bid_id)
+                .scalar_subquery()
+            )
+            owned_operation = (
+                select(sql_models.Bid.operation_id)
+                .where(sql_models.Bid.id == bid_id, policy)
+                .scalar_subquery()
+            )
+            amount_collected = (
+                sql_models.Operation.amount_collected - old_amount + amount
+            )
+            result = await db.execute(
+                update(sql_models.Operation)
+                .where(
+                    sql_models.Operation.id == owned_operation,
+                    sql_models.Operation.id.in_(open_operations),
+                    amount_collected <= sql_models.Operation.amount_required,
+                )
+                # is_closed primero: MySQL evalúa las asignaciones de izquierda a derecha
+                .ordered_values(
+                    (
+                        sql_models.Operation.is_closed,
+                        amount_collected == sql_models.Operation.amount_required,
+                    ),
+                    (sql_models.Operation.amount_collected, amount_collected),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                await db.rollback()
+                return None
+
+        if values:
+            query = update(sql_models.Bid).where(sql_models.Bid.id == bid_id, policy)
+            # Si cambió el monto la operación ya se validó (y pudo cerrarse) arriba
+            if "amount" not in values:
+                query = query.where(sql_models.Bid.operation_id.in_(open_operations))
+            result = await db.execute(
+                query.values(values).execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                await db.rollback()
+                return None
+
+        result = await db.execute(
+            select(sql_models.Bid)
+            .where(sql_models.Bid.id == bid_id, policy)
+            .execution_options(populate_existing=True)
         )
         bid = result.scalars().first()
-        if bid and hasattr(bid, property_name):
-            setattr(bid, property_name, value)
-            await db.commit()
-            await db.refresh(bid)
-            return True
-        return False
+        bid = py_schemas.BidResponse.model_validate(bid) if bid else None
+        if bid and "amount" in values:
+            await refresh_operator_summaries(
+                db,
+                select(sql_models.Operation.operator_id).where(
+                    sql_models.Operation.id == bid.operation_id
+                ),
+            )
+        await db.commit()
+        if bid and values:
+            invalidation_bus.publish(BID, bid_id)
+            if "amount" in values:
+                invalidation_bus.publish(OPERATION, bid.operation_id)
+        return bid
     except SQLAlchemyError as e:
         print(f"Error updating bid information: {str(e)}")
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Database error: {e}.",
         )
+
+
+# Tabla de resúmenes por operador
+
+
+async def refresh_operator_summaries(db: AsyncSession, operator_ids) -> None:
+    # Recalcula el resumen de los operadores indicados (lista de ids o subconsulta)
+    # dentro de la transacción del llamador, con DELETE + INSERT ... SELECT para no
+    # depender del UPSERT de cada motor. Un operador sin operaciones queda sin fila.
+    Operation, Bid = sql_models.Operation, sql_models.Bid
+    Summary = sql_models.OperatorSummary
+    if isinstance(operator_ids, (list, set, tuple)):
+        operator_ids = [str(operator_id) for operator_id in operator_ids]
+        if not operator_ids:
+            return
+
+    bids_per_operation = (
+        select(Bid.operation_id, func.count(Bid.id).label("bid_count"))
+        .where(
+            Bid.operation_id.in_(
+                select(Operation.id).where(Operation.operator_id.in_(operator_ids))
+            )
+        )
+        .group_by(Bid.operation_id)
+        .subquery()
+    )
+    aggregates = (
+        select(
+            Operation.operator_id,
+            func.count(Operation.id),
+            func.sum(case((Operation.is_closed == True, 0), else_=1)),
+            func.coalesce(func.sum(Operation.amount_required), 0),
+            func.coalesce(func.sum(Operation.amount_collected), 0),
+            func.coalesce(func.sum(bids_per_operation.c.bid_count), 0),
+        )
+        .outerjoin(
+            bids_per_operation, bids_per_operation.c.operation_id == Operation.id
+        )
+        .where(Operation.operator_id.in_(operator_ids))
+        .group_by(Operation.operator_id)
+    )
+    await db.execute(
+        delete(Summary)
+        .where(Summary.operator_id.in_(operator_ids))
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        insert(Summary).from_select(
+            [
+                Summary.operator_id,
+                Summary.operation_count,
+                Summary.open_operation_count,
+                Summary.amount_required_total,
+                Summary.amount_collected_total,
+                Summary.bid_count,
+            ],
+            aggregates,
+        )
+    )
+
+
+async def add_to_operator_summary(
+    db: AsyncSession,
+    operator_id: str,
+    bid_count: int,
+    amount_collected: Decimal,
+    closed_operations: int,
+) -> None:
+    # Ajuste incremental para el camino caliente de las ofertas (un UPDATE por lote)
+    Summary = sql_models.OperatorSummary
+    await db.execute(
+        update(Summary)
+        .where(Summary.operator_id == str(operator_id))
+        .values(
+            bid_count=Summary.bid_count + bid_count,
+            amount_collected_total=Summary.amount_collected_total + amount_collected,
+            open_operation_count=Summary.open_operation_count - closed_operations,
+        )
+        .execution_options(synchronize_session=False)
+    )
@@ -1,6 +1,7 @@
 import os
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from app.database import statement_stats
 
 # Conexion red
 # connection_string = os.environ.get("DB_INSTANCE_KLIMB_MYSQL")
@@ -17,6 +18,12 @@ engine = create_async_engine(
     pool_pre_ping=True,
 )
 
+# Estadísticas de caché de compilación por sentencia (desactivable con STATEMENT_STATS_ENABLED=0).
+# asyncmy interpola los parámetros en el cliente y no ofrece sentencias preparadas en el
+# servidor; con drivers que sí las soportan (p. ej. asyncpg) SQLAlchemy las reutiliza solo.
+if os.environ.get("STATEMENT_STATS_ENABLED", "1") == "1":
+    statement_stats.install(engine.sync_engine)
+
 # Crear la clase SessionLocal para manejar las sesiones con la base de datos
 SessionLocal = sessionmaker(
     bind=engine,
@@ -0,0 +1,61 @@
+from sqlalchemy import and_, exists, false, true
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.elements import ColumnElement
+
+import app.database.sql_models as sql_models
+import app.models.py_schemas as py_schemas
+
+
+# ======================================================
+#               POLÍTICAS DE AUTORIZACIÓN
+# ======================================================
+# Cada política expresa "el usuario puede ver/gestionar X" como un predicado
+# SQL que se agrega al WHERE de la consulta, de modo que la autorización se
+# resuelve en la base de datos junto con la lectura y no filtrando en Python.
+
+
+def _has_role(current_user: py_schemas.User, role: str) -> ColumnElement[bool]:
+    return true() if current_user.role == role else false()
+
+
+# Tabla de usuarios
+
+
+def may_manage_user(current_user: py_schemas.User) -> ColumnElement[bool]:
+    # Cada usuario solo puede modificar su propia cuenta
+    return sql_models.User.id == str(current_user.id)
+
+
+# Tabla de operaciones
+
+
+def may_manage_operation(current_user: py_schemas.User) -> ColumnElement[bool]:
+    # Solo el operador que creó la operación puede modificarla o eliminarla
+    return and_(
+        _has_role(current_user, "operador"),
+        sql_models.Operation.operator_id == str(current_user.id),
+    )
+
+
+# Tabla de ofertas
+
+
+def may_manage_bid(current_user: py_schemas.User) -> ColumnElement[bool]:
+    # Solo el inversor que realizó la oferta puede verla o eliminarla
+    return and_(
+        _has_role(current_user, "inversor"),
+        sql_models.Bid.investor_id == str(current_user.id),
+    )
+
+
+def may_view_operation_bids(current_user: py_schemas.User) -> ColumnElement[bool]:
+    # Un inversor puede ver las ofertas de una operación si él mismo ofertó en ella.
+    # Se correlaciona con la tabla `bids` de la consulta exterior (EXISTS).
+    caller_bid = aliased(sql_models.Bid)
+    return and_(
+        _has_role(current_user, "inversor"),
+        exists().where(
+            caller_bid.operation_id == sql_models.Bid.operation_id,
+            caller_bid.investor_id == str(current_user.id),
+        ),
+    )
@@ -9,10 +9,16 @@ from sqlalchemy import (
     TIMESTAMP,
     Boolean,
     VARCHAR,
+    LargeBinary,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from app.database.database import Base
 
+# Las relaciones no se cargan de forma implícita (lazy="raise"): bajo AsyncSession
+# una carga perezosa sería una consulta oculta por objeto. Cada lectura que las
+# necesite debe pedirlas con selectinload o con una subconsulta agregada.
+
 
 # Tabla de usuarios (usuarios que pueden ser operadores o inversores)
 class User(Base):
@@ -24,7 +30,7 @@ class User(Base):
     role = Column(String(20), nullable=False)
     created_at = Column(TIMESTAMP, server_default="CURRENT_TIMESTAMP")
 
-    bids = relationship("Bid", back_populates="user")
+    bids = relationship("Bid", back_populates="user", lazy="raise")
 
 
 # Tabla de operaciones financieras creadas por los operadores
@@ -40,7 +46,17 @@ class Operation(Base):
     is_closed = Column(Boolean, default=False)
     created_at = Column(TIMESTAMP, server_default="CURRENT_TIMESTAMP")
 
-    bids = relationship("Bid", back_populates="operation")
+    bids = relationship("Bid", back_populates="operation", lazy="raise")
+
+    # Panel del operador (GET /me/operations): abiertas primero, por fecha límite
+    __table_args__ = (
+        Index(
+            "idx_operations_operator_closed_deadline",
+            "operator_id",
+            "is_closed",
+            "deadline",
+        ),
+    )
 
 
 # Tabla de pujas realizadas por los inversores
@@ -54,5 +70,45 @@ class Bid(Base):
     interest_rate = Column(Float, nullable=False)
     bid_date = Column(TIMESTAMP, server_default="CURRENT_TIMESTAMP")
 
-    user = relationship("User", back_populates="bids")
-    operation = relationship("Operation", back_populates="bids")
+    user = relationship("User", back_populates="bids", lazy="raise")
+    operation = relationship("Operation", back_populates="bids", lazy="raise")
+
+    # Cartera del inversor (GET /me/bids): filtra por inversor y ordena por fecha
+    __table_args__ = (Index("idx_bids_investor_bid_date", "investor_id", "bid_date"),)
+
+
+# Resumen materializado por operador, actualizado en cada escritura
+class OperatorSummary(Base):
+    __tablename__ = "operator_summaries"
+
+    operator_id = Column(String(36), ForeignKey("users.id"), primary_key=True)
+    operation_count = Column(Integer, nullable=False, default=0)
+    open_operation_count = Column(Integer, nullable=False, default=0)
+    amount_required_total = Column(DECIMAL(17, 2), nullable=False, default=0)
+    amount_collected_total = Column(DECIMAL(17, 2), nullable=False, default=0)
+    bid_count = Column(Integer, nullable=False, default=0)
+
+
+# Registro de auditoría de ofertas y cierres (sin claves foráneas: sobrevive a los borrados)
+class AuditEvent(Base):
+    __tablename__ = "audit_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_type = Column(String(30), nullable=False)
+    operation_id = Column(Integer, nullable=False, index=True)
+    bid_id = Column(Integer)
+    actor_id = Column(String(36))
+    amount = Column(DECIMAL(15, 2))
+    occurred_at = Column(TIMESTAMP, nullable=False)
+
+
+# Tabla de respuestas almacenadas por clave de idempotencia (opcional)
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(64), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    content_type = Column(String(100))
+    body = Column(LargeBinary, nullable=False)
+    expires_at = Column(TIMESTAMP, nullable=False, index=True)
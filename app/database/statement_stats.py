@@ -0,0 +1,77 @@
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.interfaces import CacheStats
+
+
+# ======================================================
+#       ESTADÍSTICAS DE COMPILACIÓN DE SENTENCIAS
+# ======================================================
+# Cuenta por sentencia SQL cuántas veces se ejecutó, cuántas se sirvió desde la
+# caché de compilación de SQLAlchemy y cuántas tuvo que compilarse, junto con
+# el tiempo acumulado en el cursor. Sirve para confirmar que las
+# consultas calientes de crud.py (lambda_stmt) aciertan en la caché.
+
+
+@dataclass
+class StatementStats:
+    executions: int = 0
+    cache_hits: int = 0
+    compilations: int = 0
+    execute_seconds: float = 0.0
+
+
+statement_stats: Dict[str, StatementStats] = {}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    now = time.perf_counter()
+    start = conn.info["statement_start"].pop()
+
+    # Las sentencias de texto plano (DDL, exec_driver_sql) no pasan por la caché
+    if context is None or context.compiled is None:
+        return
+
+    stats = statement_stats.get(statement)
+    if stats is None:
+        stats = statement_stats[statement] = StatementStats()
+
+    stats.executions += 1
+    stats.execute_seconds += now - start
+    if context.cache_hit == CacheStats.CACHE_HIT:
+        stats.cache_hits += 1
+    elif context.cache_hit == CacheStats.CACHE_MISS:
+        stats.compilations += 1
+
+
+def _handle_error(exception_context):
+    # Si la sentencia falla no llega after_cursor_execute: se descarta su inicio
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("statement_start"):
+        conn.info["statement_start"].pop()
+
+
+def install(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def get_statement_stats() -> Dict[str, dict]:
+    return {
+        statement: asdict(stats)
+        for statement, stats in sorted(
+            statement_stats.items(), key=lambda item: -item[1].executions
+        )
+    }
+
+
+def reset_statement_stats() -> None:
+    statement_stats.clear()
@@ -1,6 +1,6 @@
 import os
 import uuid
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -36,6 +36,9 @@ ALGORITHM = "HS256"
 # Dependencia para obtener el token desde el encabezado Authorization
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
+# Variante que no exige el encabezado, para rutas públicas con datos opcionales
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/login", auto_error=False)
+
 
 # --- Obtener el Usuario Actual --- #
 # Función para obtener el usuario actual a partir del token JWT
@@ -63,3 +66,14 @@ async def get_current_user(
         raise credentials_exception
 
     return user
+
+
+# --- Obtener el Usuario Actual si hay token --- #
+# Devuelve None si la petición no trae token; si lo trae debe ser válido
+async def get_optional_current_user(
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    db: AsyncSession = Depends(get_db),
+) -> Optional[py_schemas.User]:
+    if token is None:
+        return None
+    return await get_current_user(token, db)
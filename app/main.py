@@ -1,16 +1,24 @@
 import os
 from fastapi import Depends, FastAPI
 from app.database.database import SessionLocal, engine, Base
-from app.routers import users, operations, bids
+from app.routers import users, operations, bids, health
+from app.utils.audit import audit_log
+from app.utils.idempotency import IdempotencyMiddleware
+from app.utils.invalidation import invalidation_bus
+from app.utils.warmup import warmup
 
 os.environ["REPOSITORY"] = "klimb-challenge"
 os.environ["FOLDER"] = ""
 
 app = FastAPI()
 
+# Respuestas repetidas para reintentos con la cabecera Idempotency-Key
+app.add_middleware(IdempotencyMiddleware)
+
 app.include_router(users.router)
 app.include_router(operations.router)
 app.include_router(bids.router)
+app.include_router(health.router)
 
 
 # Crear las tablas asíncronamente en el evento de inicio de la app
@@ -18,8 +26,17 @@ app.include_router(bids.router)
 async def on_startup():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    audit_log.start()
+    # Recibir las invalidaciones de los demás workers desde el arranque
+    invalidation_bus.start()
+    # Calentamiento en segundo plano; /health/ready responde 503 hasta que termina
+    warmup.start(app, engine, SessionLocal)
 
 
 @app.on_event("shutdown")
 async def on_shutdown():
+    await warmup.stop()
+    # Escribir los eventos de auditoría pendientes antes de cerrar el pool
+    await audit_log.drain()
+    invalidation_bus.close()
     await engine.dispose()
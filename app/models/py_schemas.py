@@ -71,6 +71,61 @@ class BidResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+# --- Esquemas para lecturas expandidas (?include=) ---
+class BidSummary(BaseModel):
+    bid_count: int = 0
+    total_amount: float = 0.0
+    avg_interest_rate: Optional[float] = None
+
+
+class OperationDetail(Operation):
+    # Solo se rellenan cuando se piden con ?include=bids o ?include=bid_summary
+    bids: Optional[List[Bid]] = None
+    bid_summary: Optional[BidSummary] = None
+
+
+# --- Esquemas para la cartera del inversor (GET /me/bids) ---
+class PortfolioBid(BidResponse):
+    operation_is_closed: bool
+    operation_deadline: date
+
+
+class PortfolioTotals(BaseModel):
+    bid_count: int = 0
+    committed_amount: float = 0.0
+    weighted_interest_rate: Optional[float] = None
+    open_amount: float = 0.0
+    closed_amount: float = 0.0
+
+
+class Portfolio(BaseModel):
+    totals: PortfolioTotals
+    bids: List[PortfolioBid]
+
+
+# --- Esquemas para el panel del operador (GET /me/operations) ---
+class OperatorSummary(BaseModel):
+    operation_count: int = 0
+    open_operation_count: int = 0
+    amount_required_total: float = 0.0
+    amount_collected_total: float = 0.0
+    bid_count: int = 0
+    fill_ratio: float = 0.0
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DashboardOperation(Operation):
+    bid_count: int
+    fill_ratio: float
+    days_to_deadline: int
+
+
+class OperatorDashboard(BaseModel):
+    summary: OperatorSummary
+    operations: List[DashboardOperation]
+
+
 # --- Esquemas para actualización ---
 # Esquema para actualizar usuarios
 class UserUpdate(BaseModel):
@@ -1,12 +1,18 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime, timezone
 from decimal import Decimal
 import app.database.crud as crud
+import app.database.policies as policies
+from app.database.bid_coalescer import bid_coalescer
 import app.models.py_schemas as py_schemas
 from app.dependencies import get_db, get_current_user
+from app.utils.admission import admission_control
+from app.utils import audit
+from app.utils.audit import audit_log
+from app.utils.operations_index import operations_index
 
 
 router = APIRouter(tags=["ofertas"])
@@ -17,17 +23,18 @@ router = APIRouter(tags=["ofertas"])
 # ======================================================
 @router.post(
     "/bid",
+    dependencies=[Depends(admission_control("bid-write"))],
     response_model=py_schemas.BidResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Crear una nueva puja para una operación específica.",
     description="""Este endpoint permite a los usuarios con rol de 'inversor' crear una nueva puja para una operación específica. 
         Se validan diversas condiciones antes de proceder con la creación de la puja, como la existencia de la operación, si esta está cerrada, 
         si la fecha de la operación ha expirado, si el usuario ya ha realizado una puja para la operación y si el monto de la puja es válido. 
-        En caso de que todas las validaciones sean satisfactorias, se crea la puja y se actualiza el monto recaudado de la operación correspondiente.""",
+        En caso de que todas las validaciones sean satisfactorias, se crea la puja y se actualiza el monto recaudado de la operación correspondiente. 
+        Las pujas simultáneas sobre una misma operación se validan en orden y se confirman juntas en una sola transacción.""",
 )
 async def create_bid(
     bid_data: py_schemas.BidCreate,
-    db: AsyncSession = Depends(get_db),
     current_user: py_schemas.User = Depends(get_current_user),
 ) -> py_schemas.BidResponse:
 
@@ -38,38 +45,6 @@ async def create_bid(
             detail="You do not have permission to create a bid.",
         )
 
-    operation = await crud.get_operation_by_id(db, bid_data.operation_id)
-
-    # Verifica existencia de la operación
-    if not operation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Operation not found."
-        )
-
-    # Verifica que este abierta la operación
-    if operation.is_closed:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Operation is closed"
-        )
-
-    # Compara la Fecha actual con la de cierre de la operación
-    if datetime.now(timezone.utc).date() > operation.deadline:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Operation expired by date and time",
-        )
-
-    existing_bid = await crud.get_bid_by_investor_and_operation(
-        db, current_user.id, bid_data.operation_id
-    )
-
-    # Revisa si el mismo usuario ya hizo una oferta
-    if existing_bid:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User has already bid this operation",
-        )
-
     # Se asegura de que el monto no sea cero
     if Decimal(bid_data.amount) <= 0:
         raise HTTPException(
@@ -77,27 +52,17 @@ async def create_bid(
             detail="Amount of the bid must be greater than zero",
         )
 
-    # Verifica que no se exeda el valor del monto
-    if Decimal(operation.amount_required) < Decimal(bid_data.amount) + Decimal(
-        operation.amount_collected
-    ):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Amount of the bid exceeds the value",
-        )
-
     try:
-        # Crea la oferta
-        bid = await crud.create_bid(db, bid_data, current_user)
-        bid_response = py_schemas.BidResponse.model_validate(bid)
-
-        # Actualiza la operación con el monto colectado
-        await crud.update_operation_amount_collected(
-            db, bid_data.operation_id, bid_data.amount
+        # La oferta se agrupa con las demás que lleguen a la misma operación: el lote
+        # valida existencia, cierre, fecha, oferta previa y monto contra lo recaudado,
+        # y se confirma con un solo INSERT, un solo UPDATE y un solo commit
+        return await bid_coalescer.submit(
+            bid_data.operation_id,
+            current_user.id,
+            bid_data.amount,
+            bid_data.interest_rate,
         )
 
-        return bid_response
-
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
@@ -128,16 +93,20 @@ async def get_bid_by_id(
     current_user: py_schemas.User = Depends(get_current_user),
 ) -> py_schemas.BidResponse:
 
-    bid = await crud.get_bid_by_id(db, bid_id)
+    # Trae la oferta y evalúa en la misma consulta si pertenece al usuario
+    bid_access = await crud.get_bid_with_access(
+        db, bid_id, policies.may_manage_bid(current_user)
+    )
 
     # Verifica la existencia
-    if not bid:
+    if not bid_access:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Bid not found."
         )
 
     # Comprueba el rol y si esa oferta es del ususario
-    if current_user.role != "inversor" or current_user.id != bid.investor_id:
+    bid, allowed = bid_access
+    if not allowed:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to view this bid.",
@@ -146,11 +115,117 @@ async def get_bid_by_id(
     return py_schemas.BidResponse.model_validate(bid)
 
 
+# ======================================================
+# Modificar una oferta existente por ID
+# ======================================================
+@router.patch(
+    "/bid/{bid_id}",
+    dependencies=[Depends(admission_control("bid-write"))],
+    response_model=py_schemas.BidResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Modificar una oferta existente por ID.",
+    description="""Este endpoint permite al inversor que realizó la oferta modificar su monto o su tasa de interés sin eliminarla. 
+        La oferta y el monto recaudado de la operación se actualizan en la misma transacción, comprobando en las propias sentencias 
+        la propiedad de la oferta, que la operación siga abierta y que el nuevo monto no supere el valor requerido. 
+        Si la oferta no existe se devuelve un error 404 y si el usuario no es su propietario un error 403.""",
+)
+async def update_bid(
+    bid_id: int,
+    bid_data: py_schemas.BidUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: py_schemas.User = Depends(get_current_user),
+) -> py_schemas.BidResponse:
+
+    # Se asegura de que el monto no sea cero
+    if bid_data.amount is not None and Decimal(bid_data.amount) <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Amount of the bid must be greater than zero",
+        )
+
+    policy = policies.may_manage_bid(current_user)
+    bid = await crud.update_bid_fields(db, bid_id, bid_data, policy)
+    if bid:
+        await operations_index.refresh(db, bid.operation_id)
+        return bid
+
+    # Ninguna fila afectada: se determina la causa
+    bid_access = await crud.get_bid_with_access(db, bid_id, policy)
+
+    # Verifica la existencia
+    if not bid_access:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Bid not found."
+        )
+
+    # Comprueba rol y que sea el mismo usuario que creo la oferta
+    bid, allowed = bid_access
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to update this bid.",
+        )
+
+    operation = await crud.get_operation_by_id(db, bid.operation_id)
+
+    # Verifica si esta cerrada
+    if operation.is_closed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Operation is closed"
+        )
+
+    # Compara la Fecha actual con la de cierre de la operación
+    if datetime.now(timezone.utc).date() > operation.deadline:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Operation expired by date and time",
+        )
+
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Amount of the bid exceeds the value",
+    )
+
+
+# ======================================================
+# Cartera de ofertas del inversor autenticado
+# ======================================================
+@router.get(
+    "/me/bids",
+    response_model=py_schemas.Portfolio,
+    status_code=status.HTTP_200_OK,
+    summary="Cartera de ofertas del inversor autenticado.",
+    description="""Este endpoint permite a un inversor listar sus propias ofertas en todas las operaciones, 
+        de la más reciente a la más antigua, junto con el estado y la fecha límite de cada operación. 
+        Incluye los totales de la cartera: monto comprometido, tasa de interés ponderada por monto 
+        y exposición en operaciones abiertas frente a cerradas. 
+        Los parámetros `offset` y `limit` paginan las ofertas; los totales siempre cubren toda la cartera. 
+        Si el usuario no es un inversor se devolverá un error 403.""",
+)
+async def get_my_bids(
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_db),
+    current_user: py_schemas.User = Depends(get_current_user),
+) -> py_schemas.Portfolio:
+
+    if current_user.role != "inversor":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to view bids.",
+        )
+
+    return await crud.get_investor_portfolio(
+        db, str(current_user.id), offset=offset, limit=limit
+    )
+
+
 # ======================================================
 # Elimina una oferta específica utilizando su ID
 # ======================================================
 @router.delete(
     "/bid/{bid_id}",
+    dependencies=[Depends(admission_control("bid-write"))],
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Elimina una oferta específica utilizando su ID.",
     description="""Este endpoint permite a los usuarios inversores eliminar una oferta existente. 
@@ -164,16 +239,19 @@ async def delete_bid(
     current_user: py_schemas.User = Depends(get_current_user),
 ):
 
-    bid = await crud.get_bid_by_id(db, bid_id)
+    bid_access = await crud.get_bid_with_access(
+        db, bid_id, policies.may_manage_bid(current_user)
+    )
 
     # Verifica la existencia
-    if not bid:
+    if not bid_access:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Bid not found."
         )
 
     # Comprueba rol y que sea el mismo usuario que creo la oferta
-    if current_user.role != "inversor" or current_user.id != bid.investor_id:
+    bid, allowed = bid_access
+    if not allowed:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to delete this bid.",
@@ -187,14 +265,25 @@ async def delete_bid(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Operation is closed"
         )
 
+    # Los commits expiran los objetos de la sesión: se copian antes los valores
+    operation_id, amount, investor_id = bid.operation_id, bid.amount, bid.investor_id
+
     try:
         # Actualiza el valor del monto colectado en la operación
         await crud.update_operation_amount_collected(
-            db, bid.operation_id, bid.amount, is_addition=False
+            db, operation_id, amount, is_addition=False
         )
 
         # Eliminación
         await crud.delete_bid_by_id(db, bid_id)
+        await operations_index.refresh(db, operation_id)
+        await audit_log.record(
+            audit.BID_WITHDRAWN,
+            operation_id,
+            bid_id=bid_id,
+            actor_id=investor_id,
+            amount=amount,
+        )
 
     except ValueError as e:
         raise HTTPException(
@@ -218,10 +307,13 @@ async def delete_bid(
     description="""Este endpoint permite a los usuarios obtener todas las ofertas (pujas) asociadas a una operación específica. 
         Solo los usuarios con el rol de 'inversor' pueden acceder a esta información. 
         Si el usuario no es un inversor o no está autorizado para ver las ofertas de la operación indicada, se devolverá un error 403 (Prohibido). 
-        Si no hay ofertas disponibles para la operación, se devolverá un error 404 (No encontrado).""",
+        Si no hay ofertas disponibles para la operación, se devolverá un error 404 (No encontrado).
+        Los parámetros `offset` y `limit` permiten paginar el resultado.""",
 )
 async def get_bids_by_operation_id(
     operation_id: int,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
     db: AsyncSession = Depends(get_db),
     current_user: py_schemas.User = Depends(get_current_user),
 ) -> List[py_schemas.BidResponse]:
@@ -232,20 +324,30 @@ async def get_bids_by_operation_id(
             detail="You do not have permission to view bids.",
         )
 
-    bids = await crud.get_bids_by_operation_id(db, operation_id)
+    # La autorización (EXISTS sobre las ofertas del usuario) viaja en la misma consulta que la página
+    policy = policies.may_view_operation_bids(current_user)
+    bids = await crud.get_bids_by_operation_id(
+        db, operation_id, policy=policy, offset=offset, limit=limit
+    )
 
-    # Verifica la existencia
+    # Página vacía: se distingue entre operación sin ofertas y usuario sin permiso
     if not bids:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No bids found for this operation.",
+        has_bids, allowed = await crud.get_operation_bids_access(
+            db, operation_id, policy
         )
 
-    # Comprueba que el usuario actual esté en la lista de los que invirtieron en esa operación
-    if not current_user.id in [item.investor_id for item in bids]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You are not authorized to view bids for this operation.",
-        )
+        # Verifica la existencia
+        if not has_bids:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No bids found for this operation.",
+            )
+
+        # Comprueba que el usuario actual esté entre los que invirtieron en esa operación
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You are not authorized to view bids for this operation.",
+            )
 
     return [py_schemas.BidResponse.model_validate(bid) for bid in bids]
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from app.utils.warmup import warmup
+
+
+router = APIRouter(tags=["Salud"])
+
+
+# ======================================================
+# Comprobar que el proceso está vivo
+# ======================================================
+@router.get(
+    "/health/live",
+    status_code=status.HTTP_200_OK,
+    summary="Comprobar que el proceso está vivo.",
+    description="""Responde siempre 200 mientras el proceso atiende peticiones. No consulta la base de datos.""",
+)
+async def live():
+    return {"status": "alive"}
+
+
+# ======================================================
+# Comprobar que el worker está listo para recibir tráfico
+# ======================================================
+@router.get(
+    "/health/ready",
+    status_code=status.HTTP_200_OK,
+    summary="Comprobar que el worker está listo para recibir tráfico.",
+    description="""Responde 200 cuando terminó el calentamiento de arranque (pool de conexiones, sentencias compiladas, esquemas, índice de operaciones y bcrypt) 
+        y 503 mientras sigue en curso o si falló (se reintenta). Incluye la duración de cada fase del calentamiento.""",
+)
+async def ready():
+    return JSONResponse(
+        status_code=(
+            status.HTTP_200_OK if warmup.ready else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+        content=warmup.status(),
+    )
@@ -1,10 +1,19 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 import app.database.crud as crud
+import app.database.policies as policies
 import app.models.py_schemas as py_schemas
-from app.dependencies import get_db, get_current_user
+from app.dependencies import get_db, get_current_user, get_optional_current_user
+from app.utils.admission import admission_control
+from app.utils import audit
+from app.utils.audit import audit_log
+from app.utils.operations_index import (
+    OPERATIONS_INDEX_ENABLED,
+    SORT_KEYS,
+    operations_index,
+)
 
 
 router = APIRouter(tags=["Operaciones"])
@@ -15,6 +24,7 @@ router = APIRouter(tags=["Operaciones"])
 # ======================================================
 @router.post(
     "/operation",
+    dependencies=[Depends(admission_control("operation-write"))],
     response_model=py_schemas.Operation,
     status_code=status.HTTP_201_CREATED,
     summary="Crear una nueva operación (solo para operadores).",
@@ -46,6 +56,7 @@ async def create_operation(
     try:
         # Crear operación
         operation = await crud.create_operation(db, operation_data, current_user)
+        operations_index.upsert(operation)
         return operation
 
     except SQLAlchemyError:
@@ -64,6 +75,7 @@ async def create_operation(
 # ======================================================
 @router.delete(
     "/operation/{operation_id}",
+    dependencies=[Depends(admission_control("operation-write"))],
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Eliminar una operación específica por ID.",
     description="""Esta ruta permite a los operadores eliminar una operación específica, identificada por su operation_id. 
@@ -76,16 +88,20 @@ async def delete_operation(
     db: AsyncSession = Depends(get_db),
     current_user: py_schemas.User = Depends(get_current_user),
 ):
-    operation = await crud.get_operation_by_id(db, operation_id)
+    # Trae la operación y evalúa en la misma consulta si el usuario puede gestionarla
+    operation_access = await crud.get_operation_with_access(
+        db, operation_id, policies.may_manage_operation(current_user)
+    )
 
     # Verifica que existe la operación
-    if not operation:
+    if not operation_access:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Operation not found."
         )
 
     # Verifica el rol de operador y que sea el mismo usuario que la creó
-    if current_user.role != "operador" or current_user.id != operation.operator_id:
+    operation, allowed = operation_access
+    if not allowed:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to delete this operation.",
@@ -94,6 +110,7 @@ async def delete_operation(
     try:
         # La elimina
         await crud.delete_operation_by_id(db, operation_id)
+        operations_index.discard(operation_id)
 
     except SQLAlchemyError:
         raise HTTPException(
@@ -106,25 +123,159 @@ async def delete_operation(
         )
 
 
+# ======================================================
+# Actualizar parcialmente una operación por ID
+# ======================================================
+@router.patch(
+    "/operation/{operation_id}",
+    dependencies=[Depends(admission_control("operation-write"))],
+    response_model=py_schemas.Operation,
+    status_code=status.HTTP_200_OK,
+    summary="Actualizar parcialmente una operación por ID.",
+    description="""Esta ruta permite al operador que creó la operación modificar uno o varios de sus campos. 
+        Todos los campos enviados se aplican en una única sentencia UPDATE que incluye la verificación de propiedad. 
+        El monto requerido debe ser mayor que cero y no puede quedar por debajo del monto ya recaudado. 
+        Si la operación no existe se devuelve un error 404 y si el usuario no es su propietario un error 403.""",
+)
+async def update_operation(
+    operation_id: int,
+    operation_data: py_schemas.OperationUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: py_schemas.User = Depends(get_current_user),
+) -> py_schemas.Operation:
+
+    # El monto no puede ser negativo ni cero
+    if (
+        operation_data.amount_required is not None
+        and operation_data.amount_required <= 0
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The amount must be greater than zero.",
+        )
+
+    policy = policies.may_manage_operation(current_user)
+    operation = await crud.update_operation_fields(
+        db, operation_id, operation_data, policy
+    )
+    if operation:
+        operations_index.upsert(operation)
+        if operation_data.is_closed:
+            await audit_log.record(
+                audit.OPERATION_CLOSED,
+                operation_id,
+                actor_id=str(operation.operator_id),
+            )
+        return operation
+
+    # Ninguna fila afectada: se determina la causa
+    operation_access = await crud.get_operation_with_access(db, operation_id, policy)
+
+    # Verifica que existe la operación
+    if not operation_access:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Operation not found."
+        )
+
+    # Verifica el rol de operador y que sea el mismo usuario que la creó
+    if not operation_access[1]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to update this operation.",
+        )
+
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="The amount required cannot be lower than the amount collected.",
+    )
+
+
 # ======================================================
 # Listar operaciones activas
 # ======================================================
 @router.get(
     "/operations",
-    response_model=List[py_schemas.Operation],
+    response_model=List[py_schemas.OperationDetail],
+    response_model_exclude_none=True,
     status_code=status.HTTP_200_OK,
     summary="Listar operaciones activas.",
     description="""Este endpoint permite obtener una lista de todas las operaciones activas en el sistema. 
         Devuelve un conjunto de datos que incluye información relevante sobre cada operación, 
         como su estado, fecha de inicio y detalles asociados. Este endpoint es útil para 
-        monitorear las operaciones que están actualmente en curso.""",
+        monitorear las operaciones que están actualmente en curso. 
+        Con `include=bid_summary` cada operación incluye el número de ofertas, el monto total ofertado 
+        y la tasa de interés media, calculados en la misma consulta. 
+        El parámetro `sort` ordena el listado por `id` (por defecto), `deadline`, `interest_rate` o `remaining` (monto restante), 
+        y los parámetros `offset` y `limit` permiten paginar el resultado.""",
 )
 async def list_active_operations(
+    include: Optional[str] = Query(None),
+    sort: str = Query("id"),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_db),
+) -> List[py_schemas.OperationDetail]:
+
+    if sort not in SORT_KEYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported sort: {sort}.",
+        )
+
+    if include is None:
+        # Listado servido desde el índice en memoria con el JSON ya codificado
+        if OPERATIONS_INDEX_ENABLED:
+            body = await operations_index.listing(db, sort, offset, limit)
+            return Response(content=body, media_type="application/json")
+
+        operations = await crud.get_active_operations(db)
+        # Se valida con el esquema base: el esquema detallado leería `bids` (lazy="raise")
+        operations = [py_schemas.Operation.model_validate(op) for op in operations]
+
+    elif include == "bid_summary":
+        operations = await crud.get_active_operations_with_bid_summary(db)
+
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported include: {include}.",
+        )
+
+    operations = sorted(operations, key=SORT_KEYS[sort])
+    return operations[offset : None if limit is None else offset + limit]
+
+
+# ======================================================
+# Panel de operaciones del operador autenticado
+# ======================================================
+@router.get(
+    "/me/operations",
+    response_model=py_schemas.OperatorDashboard,
+    status_code=status.HTTP_200_OK,
+    summary="Panel de operaciones del operador autenticado.",
+    description="""Este endpoint permite a un operador listar sus propias operaciones, abiertas primero y ordenadas por fecha límite. 
+        Cada operación incluye su porcentaje de financiación (`fill_ratio`), el número de ofertas recibidas 
+        y los días que faltan para su fecha límite. La respuesta incluye además el resumen del operador 
+        (operaciones, operaciones abiertas, montos requerido y recaudado, ofertas), que se mantiene actualizado en cada escritura. 
+        Los parámetros `offset` y `limit` paginan las operaciones. 
+        Si el usuario no es un operador se devolverá un error 403.""",
+)
+async def get_my_operations(
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
     db: AsyncSession = Depends(get_db),
-) -> List[py_schemas.Operation]:
+    current_user: py_schemas.User = Depends(get_current_user),
+) -> py_schemas.OperatorDashboard:
 
-    operations = await crud.get_active_operations(db)
-    return operations
+    if current_user.role != "operador":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to view operations.",
+        )
+
+    return await crud.get_operator_dashboard(
+        db, str(current_user.id), offset=offset, limit=limit
+    )
 
 
 # ======================================================
@@ -132,18 +283,46 @@ async def list_active_operations(
 # ======================================================
 @router.get(
     "/operation/{operation_id}",
-    response_model=py_schemas.Operation,
+    response_model=py_schemas.OperationDetail,
+    response_model_exclude_none=True,
     status_code=status.HTTP_200_OK,
     summary="Obtener información de una operación específica por su ID.",
     description="""Este endpoint permite obtener los detalles de una operación existente en el sistema. 
         Se debe proporcionar el ID de la operación como parámetro en la URL. 
-        Si la operación no se encuentra, se devolverá un error 404 con un mensaje indicando que la operación no fue encontrada.""",
+        Si la operación no se encuentra, se devolverá un error 404 con un mensaje indicando que la operación no fue encontrada. 
+        Con `include=bids` la respuesta incluye las ofertas de la operación que el usuario autenticado puede ver 
+        (las mismas que en `/operation/{operation_id}/bids`), cargadas en una consulta adicional fija.""",
 )
 async def get_operation(
-    operation_id: int, db: AsyncSession = Depends(get_db)
-) -> py_schemas.Operation:
+    operation_id: int,
+    include: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[py_schemas.User] = Depends(get_optional_current_user),
+) -> py_schemas.OperationDetail:
+
+    if include is None:
+        operation = await crud.get_operation_by_id(db, operation_id)
+        # Se valida con el esquema base: el esquema detallado leería `bids` (lazy="raise")
+        if operation:
+            operation = py_schemas.Operation.model_validate(operation)
+
+    elif include == "bids":
+        # Las ofertas solo se muestran a usuarios autenticados
+        if current_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        operation = await crud.get_operation_with_bids(
+            db, operation_id, policies.may_view_operation_bids(current_user)
+        )
 
-    operation = await crud.get_operation_by_id(db, operation_id)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported include: {include}.",
+        )
 
     # Verifica existencia de la operación
     if not operation:
@@ -168,7 +347,10 @@ async def get_operation(
 async def update_expired_operations(db: AsyncSession = Depends(get_db)):
     try:
         # Actualiza y cierra las operaciones comparando fechas
-        await crud.update_expired_operations(db)
+        closed = await crud.update_expired_operations(db)
+        operations_index.invalidate()
+        for operation_id in closed:
+            await audit_log.record(audit.OPERATION_CLOSED, operation_id)
 
     except SQLAlchemyError:
         raise HTTPException(
@@ -5,8 +5,10 @@ from sqlalchemy.exc import SQLAlchemyError
 from fastapi.security import OAuth2PasswordRequestForm
 from passlib.context import CryptContext
 import app.database.crud as crud
+import app.database.policies as policies
 import app.models.py_schemas as py_schemas
-from app.dependencies import get_db
+from app.dependencies import get_db, get_current_user
+from app.utils.operations_index import operations_index
 from app.utils.token_generator import create_access_token
 
 
@@ -122,6 +124,8 @@ async def delete_user(user_id: str, db: AsyncSession = Depends(get_db)):
     try:
         # Eliminar usuario
         await crud.delete_user_by_id(db, user_id)
+        # Sus operaciones y ofertas se borraron en bloque
+        operations_index.invalidate()
 
     except SQLAlchemyError:
         raise HTTPException(
@@ -134,6 +138,44 @@ async def delete_user(user_id: str, db: AsyncSession = Depends(get_db)):
         )
 
 
+# ======================================================
+# Actualizar parcialmente un usuario por ID
+# ======================================================
+@router.patch(
+    "/user/{user_id}",
+    response_model=py_schemas.User,
+    status_code=status.HTTP_200_OK,
+    summary="Actualizar parcialmente un usuario por ID.",
+    description="""Esta ruta permite a un usuario autenticado modificar su nombre de usuario, su rol o su contraseña. 
+        Todos los campos enviados se aplican en una única sentencia UPDATE que solo afecta a la cuenta del propio usuario. 
+        Si el usuario no existe se devuelve un error 404, si se intenta modificar otra cuenta un error 403 
+        y si el nuevo nombre de usuario ya está registrado un error 400.""",
+)
+async def update_user(
+    user_id: str,
+    user_data: py_schemas.UserUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: py_schemas.User = Depends(get_current_user),
+) -> py_schemas.User:
+
+    user = await crud.update_user_fields(
+        db, user_id, user_data, policies.may_manage_user(current_user)
+    )
+    if user:
+        return user
+
+    # Ninguna fila afectada: se determina la causa
+    if not await crud.get_user_by_id(db, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found."
+        )
+
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="You do not have permission to update this user.",
+    )
+
+
 # ======================================================
 # Obtener información del usuario por ID
 # ======================================================
@@ -0,0 +1,206 @@
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from typing import AsyncGenerator, Callable, Deque, Dict, Optional
+
+from fastapi import Depends, HTTPException, Request, status
+from jose import JWTError, jwt
+
+from app.database.database import engine
+from app.dependencies import ALGORITHM, SECRET_KEY, oauth2_scheme
+
+
+# ======================================================
+#          CONTROL DE ADMISIÓN PARA ESCRITURAS
+# ======================================================
+# Las rutas de escritura (POST/DELETE de ofertas y operaciones) pasan por una
+# compuerta por ruta con concurrencia máxima y una cola de espera acotada, y
+# por un token bucket por usuario. Cuando algo se satura se responde de
+# inmediato con 429/503 y `Retry-After` en lugar de esperar en el pool de
+# conexiones de SQLAlchemy. Las rutas de lectura no pasan por aquí.
+
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "1") == "1"
+ADMISSION_MAX_CONCURRENT = int(os.environ.get("ADMISSION_MAX_CONCURRENT", "16"))
+ADMISSION_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", "64"))
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", "2.0"))
+USER_RATE_PER_SECOND = float(os.environ.get("ADMISSION_USER_RATE", "5"))
+USER_BURST = int(os.environ.get("ADMISSION_USER_BURST", "10"))
+MAX_TRACKED_USERS = 10_000
+
+
+def _retry_after(seconds: float) -> Dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+
+# --- Token bucket por usuario ---
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        # Devuelve 0 si hay token disponible, o los segundos hasta el próximo token
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class UserRateLimiter:
+    def __init__(self, rate: float, burst: int, max_users: int = MAX_TRACKED_USERS):
+        self.rate = rate
+        self.burst = burst
+        self.max_users = max_users
+        self.buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def check(self, key: str) -> None:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst)
+            self.buckets[key] = bucket
+            # Se descartan los usuarios menos recientes para acotar la memoria
+            if len(self.buckets) > self.max_users:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+
+        wait = bucket.take()
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests.",
+                headers=_retry_after(wait),
+            )
+
+
+# --- Compuerta de concurrencia por ruta ---
+class AdmissionGate:
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, timeout: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.rejected = 0
+
+    async def acquire(self) -> None:
+        if self.active < self.max_concurrent and not self.waiters:
+            self.active += 1
+            return
+
+        # Cola llena: se rechaza sin esperar
+        if len(self.waiters) >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later.",
+                headers=_retry_after(self.timeout),
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # El turno llegó justo al expirar: se devuelve
+                self.release()
+            else:
+                waiter.cancel()
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later.",
+                headers=_retry_after(self.timeout),
+            )
+        finally:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+
+    def release(self) -> None:
+        # El cupo se entrega directamente al siguiente en la cola
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "active": self.active,
+            "queued": len(self.waiters),
+            "rejected": self.rejected,
+        }
+
+
+# --- Saturación del pool de conexiones ---
+def pool_is_saturated() -> bool:
+    pool = engine.pool
+    if not hasattr(pool, "checkedout") or not hasattr(pool, "size"):
+        return False
+    capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+    return pool.checkedout() >= capacity
+
+
+user_rate_limiter = UserRateLimiter(USER_RATE_PER_SECOND, USER_BURST)
+gates: Dict[str, AdmissionGate] = {}
+
+
+def _rate_limit_key(request: Request, token: str) -> str:
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username: Optional[str] = payload.get("sub")
+        if username:
+            return f"user:{username}"
+    except JWTError:
+        pass
+    # Token inválido: get_current_user responderá 401, se limita por IP
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+# Dependencia para proteger una ruta de escritura
+def admission_control(route: str) -> Callable[..., AsyncGenerator[None, None]]:
+    gate = gates.setdefault(
+        route,
+        AdmissionGate(
+            route,
+            ADMISSION_MAX_CONCURRENT,
+            ADMISSION_MAX_QUEUE,
+            ADMISSION_QUEUE_TIMEOUT,
+        ),
+    )
+
+    async def dependency(
+        request: Request, token: str = Depends(oauth2_scheme)
+    ) -> AsyncGenerator[None, None]:
+        if not ADMISSION_ENABLED:
+            yield
+            return
+
+        user_rate_limiter.check(_rate_limit_key(request, token))
+
+        if pool_is_saturated():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database is busy, try again later.",
+                headers=_retry_after(1),
+            )
+
+        await gate.acquire()
+        try:
+            yield
+        finally:
+            gate.release()
+
+    return dependency
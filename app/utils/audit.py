@@ -0,0 +1,258 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+
+import app.database.sql_models as sql_models
+from app.database.database import SessionLocal
+
+
+# ======================================================
+#            REGISTRO DE AUDITORÍA ASÍNCRONO
+# ======================================================
+# Cada oferta creada o retirada y cada cierre de operación deja un evento de
+# auditoría. Las rutas lo encolan después del commit (sin esperar a escribirlo)
+# en una cola acotada; una tarea de fondo lo escribe por lotes, con un INSERT
+# multi-fila en `audit_events` o añadiendo líneas JSON a un archivo de
+# segmentos con un único fsync por lote. Si la cola se llena, quien registra
+# espera (contrapresión) en lugar de perder eventos. Al apagar se vacía la cola.
+
+AUDIT_ENABLED = os.environ.get("AUDIT_ENABLED", "1") == "1"
+AUDIT_SINK = os.environ.get("AUDIT_SINK", "db")  # "db" o "file"
+AUDIT_DIR = os.environ.get("AUDIT_DIR", "audit")
+AUDIT_QUEUE_SIZE = int(os.environ.get("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.environ.get("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL = float(os.environ.get("AUDIT_FLUSH_INTERVAL", "0.05"))
+AUDIT_SEGMENT_BYTES = int(os.environ.get("AUDIT_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+AUDIT_RETRY_SECONDS = 0.5
+
+BID_PLACED = "bid_placed"
+BID_WITHDRAWN = "bid_withdrawn"
+OPERATION_CLOSED = "operation_closed"
+
+
+@dataclass
+class AuditEvent:
+    event_type: str
+    operation_id: int
+    bid_id: Optional[int] = None
+    actor_id: Optional[str] = None
+    amount: Optional[Decimal] = None
+    occurred_at: datetime = field(
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None)
+    )
+    # Momento en que entró en la cola, para medir el retraso de escritura
+    enqueued_at: float = field(default_factory=time.monotonic, repr=False)
+
+    def row(self) -> dict:
+        values = asdict(self)
+        values.pop("enqueued_at")
+        return values
+
+
+# --- Destinos ---
+class DatabaseAuditSink:
+    def __init__(self, session_factory: sessionmaker = SessionLocal):
+        self.session_factory = session_factory
+
+    async def write(self, events: List[AuditEvent]) -> None:
+        async with self.session_factory() as db:
+            await db.execute(
+                insert(sql_models.AuditEvent).values([event.row() for event in events])
+            )
+            await db.commit()
+
+
+class FileAuditSink:
+    # Segmentos `audit-000001.jsonl`, `audit-000002.jsonl`, ... que solo crecen;
+    # se pasa al siguiente al superar `segment_bytes`
+    def __init__(
+        self, directory: str = AUDIT_DIR, segment_bytes: int = AUDIT_SEGMENT_BYTES
+    ):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.file = None
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"audit-{number:06d}.jsonl")
+
+    def _open_segment(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        numbers = [
+            int(name[6:12])
+            for name in os.listdir(self.directory)
+            if name.startswith("audit-") and name.endswith(".jsonl")
+        ]
+        number = max(numbers, default=1)
+        if os.path.exists(self._segment_path(number)) and (
+            os.path.getsize(self._segment_path(number)) >= self.segment_bytes
+        ):
+            number += 1
+        self.file = open(self._segment_path(number), "ab")
+        self.number = number
+
+    def _append(self, events: List[AuditEvent]) -> None:
+        if self.file is None:
+            self._open_segment()
+        elif self.file.tell() >= self.segment_bytes:
+            self.file.close()
+            self.file = open(self._segment_path(self.number + 1), "ab")
+            self.number += 1
+
+        data = b"".join(
+            json.dumps(event.row(), default=str, separators=(",", ":")).encode() + b"\n"
+            for event in events
+        )
+        self.file.write(data)
+        self.file.flush()
+        # Un único fsync para todo el lote
+        os.fsync(self.file.fileno())
+
+    async def write(self, events: List[AuditEvent]) -> None:
+        await asyncio.to_thread(self._append, events)
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+# --- Cola y tarea de escritura ---
+class AuditLog:
+    def __init__(
+        self,
+        sink=None,
+        queue_size: int = AUDIT_QUEUE_SIZE,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL,
+        enabled: bool = AUDIT_ENABLED,
+    ):
+        self.sink = sink
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        self.batch: List[AuditEvent] = []
+        # Métricas
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self.backpressure_waits = 0
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+
+    def start(self) -> None:
+        if self.task is not None and not self.task.done():
+            return
+        if self.sink is None:
+            self.sink = FileAuditSink() if AUDIT_SINK == "file" else DatabaseAuditSink()
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.task = asyncio.create_task(self._run())
+
+    async def record(self, event_type: str, operation_id: int, **fields) -> None:
+        if not self.enabled:
+            return
+        if self.task is None or self.task.done():
+            self.start()
+
+        event = AuditEvent(event_type, operation_id, **fields)
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.backpressure_waits += 1
+            await self.queue.put(event)
+        self.enqueued += 1
+
+    async def _run(self) -> None:
+        while True:
+            if not self.batch:
+                self.batch.append(await self.queue.get())
+                # Ventana corta para juntar los eventos que lleguen detrás
+                deadline = time.monotonic() + self.flush_interval
+                while len(self.batch) < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        self.batch.append(
+                            await asyncio.wait_for(self.queue.get(), timeout)
+                        )
+                    except asyncio.TimeoutError:
+                        break
+
+            if not await self._flush():
+                # El lote se conserva y se reintenta
+                await asyncio.sleep(AUDIT_RETRY_SECONDS)
+
+    async def _flush(self) -> bool:
+        batch = self.batch
+        try:
+            await self.sink.write(batch)
+        except (SQLAlchemyError, OSError) as e:
+            self.failures += 1
+            print(f"Error writing audit events: {str(e)}")
+            return False
+
+        lag = time.monotonic() - batch[0].enqueued_at
+        self.last_lag_seconds = lag
+        self.max_lag_seconds = max(self.max_lag_seconds, lag)
+        self.written += len(batch)
+        self.batches += 1
+        self.batch = []
+        return True
+
+    async def drain(self, timeout: float = 10.0) -> None:
+        # Deja que la tarea de fondo escriba lo pendiente y luego la detiene
+        # mientras espera en la cola, nunca a mitad de una escritura
+        if self.task is None:
+            return
+        end = time.monotonic() + timeout
+        while self.pending() and not self.task.done() and time.monotonic() < end:
+            await asyncio.sleep(0.01)
+        if self.pending():
+            print(f"Audit drain gave up with {self.pending()} events pending")
+
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+        if isinstance(self.sink, FileAuditSink):
+            self.sink.close()
+
+    def pending(self) -> int:
+        return (self.queue.qsize() if self.queue else 0) + len(self.batch)
+
+    def stats(self) -> Dict[str, float]:
+        # Retraso de cola: edad del evento más antiguo aún sin escribir
+        oldest = self.batch[0] if self.batch else None
+        if oldest is None and self.queue is not None and self.queue.qsize():
+            oldest = self.queue._queue[0]
+        return {
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "pending": self.pending(),
+            "batches": self.batches,
+            "failures": self.failures,
+            "backpressure_waits": self.backpressure_waits,
+            "queue_lag_seconds": (
+                time.monotonic() - oldest.enqueued_at if oldest else 0.0
+            ),
+            "last_lag_seconds": self.last_lag_seconds,
+            "max_lag_seconds": self.max_lag_seconds,
+        }
+
+
+audit_log = AuditLog()
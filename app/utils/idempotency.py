@@ -0,0 +1,271 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, NamedTuple, Optional
+
+from jose import JWTError, jwt
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+import app.database.crud as crud
+import app.database.sql_models as sql_models
+from app.database.database import SessionLocal
+from app.dependencies import ALGORITHM, SECRET_KEY
+
+
+# ======================================================
+#        CLAVES DE IDEMPOTENCIA (Idempotency-Key)
+# ======================================================
+# Los clientes reintentan POST /bid y POST /operation cuando hay timeouts de
+# red. Si la petición trae `Idempotency-Key`, la primera respuesta se guarda
+# (LRU en memoria con TTL y, opcionalmente, la tabla `idempotency_keys`) y los
+# reintentos se responden desde ahí sin pasar por la autenticación ni por crud.
+# Un duplicado que llega mientras el original sigue en curso espera su resultado.
+
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.environ.get("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+IDEMPOTENCY_DB_ENABLED = os.environ.get("IDEMPOTENCY_DB_ENABLED", "0") == "1"
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.environ.get("IDEMPOTENCY_WAIT_TIMEOUT", "30"))
+IDEMPOTENCY_HEADER = b"idempotency-key"
+IDEMPOTENT_ROUTES = {("POST", "/bid"), ("POST", "/operation")}
+MAX_KEY_LENGTH = 255
+
+
+class StoredResponse(NamedTuple):
+    request_hash: str
+    status_code: int
+    content_type: Optional[str]
+    body: bytes
+    expires_at: float
+
+
+class IdempotencyStore:
+    def __init__(
+        self,
+        ttl: int = IDEMPOTENCY_TTL_SECONDS,
+        max_entries: int = IDEMPOTENCY_MAX_ENTRIES,
+        use_db: bool = IDEMPOTENCY_DB_ENABLED,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.use_db = use_db
+        self.entries: "OrderedDict[str, StoredResponse]" = OrderedDict()
+        self.in_flight: Dict[str, asyncio.Future] = {}
+
+    def _remember(self, key: str, stored: StoredResponse) -> None:
+        self.entries[key] = stored
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        stored = self.entries.get(key)
+        if stored is not None:
+            if stored.expires_at > time.time():
+                self.entries.move_to_end(key)
+                return stored
+            del self.entries[key]
+
+        if not self.use_db:
+            return None
+
+        async with SessionLocal() as db:
+            record = await crud.get_idempotency_record(db, key)
+        if record is None:
+            return None
+
+        stored = StoredResponse(
+            record.request_hash,
+            record.status_code,
+            record.content_type,
+            record.body,
+            record.expires_at.replace(tzinfo=timezone.utc).timestamp(),
+        )
+        self._remember(key, stored)
+        return stored
+
+    async def put(
+        self,
+        key: str,
+        request_hash: str,
+        status_code: int,
+        content_type: Optional[str],
+        body: bytes,
+    ) -> None:
+        expires_at = time.time() + self.ttl
+        self._remember(
+            key,
+            StoredResponse(request_hash, status_code, content_type, body, expires_at),
+        )
+
+        if self.use_db:
+            async with SessionLocal() as db:
+                await crud.create_idempotency_record(
+                    db,
+                    sql_models.IdempotencyKey(
+                        key=key,
+                        request_hash=request_hash,
+                        status_code=status_code,
+                        content_type=content_type,
+                        body=body,
+                        expires_at=datetime.now(timezone.utc)
+                        + timedelta(seconds=self.ttl),
+                    ),
+                )
+
+
+idempotency_store = IdempotencyStore()
+
+
+def _is_storable(status_code: int) -> bool:
+    # Los errores transitorios (429, 5xx) no se guardan para permitir reintentar
+    return status_code < 500 and status_code != 429
+
+
+def _subject(authorization: Optional[bytes]) -> Optional[str]:
+    # La clave se asocia al usuario del token para que no se compartan respuestas
+    if not authorization or not authorization.lower().startswith(b"bearer "):
+        return None
+    try:
+        payload = jwt.decode(
+            authorization[7:].decode("latin-1"), SECRET_KEY, algorithms=[ALGORITHM]
+        )
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+
+class IdempotencyMiddleware:
+    def __init__(self, app: ASGIApp, store: IdempotencyStore = idempotency_store):
+        self.app = app
+        self.store = store
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or (scope["method"], scope["path"]) not in IDEMPOTENT_ROUTES
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER)
+        subject = _subject(headers.get(b"authorization"))
+
+        # Sin clave o sin token válido se procesa normalmente (la ruta responderá 401)
+        if not idempotency_key or subject is None:
+            await self.app(scope, receive, send)
+            return
+
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                {"detail": "Idempotency-Key is too long."}, status_code=400
+            )
+            await response(scope, receive, send)
+            return
+
+        key = hashlib.sha256(
+            b"\n".join(
+                (
+                    scope["method"].encode(),
+                    scope["path"].encode(),
+                    subject.encode(),
+                    idempotency_key,
+                )
+            )
+        ).hexdigest()
+
+        # Se lee el cuerpo completo para calcular su huella y luego se reenvía
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+        request_hash = hashlib.sha256(body).hexdigest()
+
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        while True:
+            stored = await self.store.get(key)
+            if stored is not None:
+                await self._replay(stored, request_hash, scope, receive, send)
+                return
+
+            in_flight = self.store.in_flight.get(key)
+            if in_flight is None:
+                break
+
+            # Duplicado en curso: espera al original en lugar de ejecutarse otra vez
+            try:
+                await asyncio.wait_for(
+                    asyncio.shield(in_flight), IDEMPOTENCY_WAIT_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                response = JSONResponse(
+                    {"detail": "A request with this Idempotency-Key is in progress."},
+                    status_code=409,
+                )
+                await response(scope, receive, send)
+                return
+
+        leader = asyncio.get_running_loop().create_future()
+        self.store.in_flight[key] = leader
+        status_code = 500
+        content_type: Optional[str] = None
+        chunks = []
+
+        async def capture_send(message: Message) -> None:
+            nonlocal status_code, content_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type":
+                        content_type = value.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+            if _is_storable(status_code):
+                await self.store.put(
+                    key, request_hash, status_code, content_type, b"".join(chunks)
+                )
+        finally:
+            del self.store.in_flight[key]
+            leader.set_result(None)
+
+    async def _replay(
+        self,
+        stored: StoredResponse,
+        request_hash: str,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        if stored.request_hash != request_hash:
+            response: Response = JSONResponse(
+                {
+                    "detail": "Idempotency-Key was already used with a different request."
+                },
+                status_code=422,
+            )
+        else:
+            response = Response(
+                stored.body,
+                status_code=stored.status_code,
+                media_type=stored.content_type,
+                headers={"Idempotent-Replayed": "true"},
+            )
+        await response(scope, receive, send)
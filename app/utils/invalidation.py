@@ -0,0 +1,267 @@
+import asyncio
+import itertools
+import json
+import os
+import socket
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional
+
+# ======================================================
+#        BUS DE INVALIDACIÓN ENTRE WORKERS
+# ======================================================
+# Con varios workers de uvicorn cada proceso tiene sus propias cachés (por
+# ejemplo el índice de operaciones activas) y no ve las escrituras que atiende
+# otro worker. Las rutas de escritura de `crud.py` publican, después del
+# commit, un evento "entidad, id, versión" en este bus y las cachés de cada
+# worker se suscriben para descartar lo que quedó obsoleto.
+#
+# Dos backends:
+#   - "local": solo entrega dentro del proceso (un único worker, pruebas).
+#   - "unix": cada worker enlaza un socket Unix de datagramas en
+#     INVALIDATION_DIR y publicar es enviar el evento a los sockets de los
+#     demás. No hay proceso intermediario; los sockets de workers muertos se
+#     eliminan al primer envío rechazado.
+
+INVALIDATION_BACKEND = os.environ.get("INVALIDATION_BACKEND", "local")
+INVALIDATION_DIR = os.environ.get("INVALIDATION_DIR", "/tmp/klimb-invalidation")
+# Eventos retenidos por worker lento antes de reemplazarlos por un "borrar todo"
+INVALIDATION_BACKLOG = int(os.environ.get("INVALIDATION_BACKLOG", "1000"))
+INVALIDATION_RETRY_SECONDS = 0.005
+
+USER = "user"
+OPERATION = "operation"
+BID = "bid"
+# Entidad comodín: invalida todas las cachés
+ALL = "*"
+
+_bus_ids = itertools.count(1)
+
+
+@dataclass
+class InvalidationEvent:
+    entity: str
+    # None invalida todas las filas de la entidad (cambios masivos)
+    entity_id: Optional[object]
+    # Marca de tiempo en nanosegundos de la publicación; ordena los eventos de
+    # un mismo host y permite medir la latencia de entrega
+    version: int
+    origin: str
+    # True si se publicó en este mismo proceso
+    local: bool = False
+
+    def encode(self) -> bytes:
+        return json.dumps(
+            [self.entity, self.entity_id, self.version, self.origin],
+            separators=(",", ":"),
+        ).encode()
+
+    @classmethod
+    def decode(cls, payload: bytes) -> "InvalidationEvent":
+        entity, entity_id, version, origin = json.loads(payload)
+        return cls(entity, entity_id, version, origin)
+
+
+# --- Backends ---
+class InProcessBackend:
+    def open(self, receive: Callable[[bytes], None], flush_all: Callable) -> None:
+        pass
+
+    def send(self, payload: bytes) -> None:
+        # Los suscriptores locales ya recibieron el evento en `publish`
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class UnixSocketBackend:
+    def __init__(self, directory: str = INVALIDATION_DIR):
+        self.directory = directory
+        self.path: Optional[str] = None
+        self.sock: Optional[socket.socket] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        # Datagramas pendientes por destino cuando su buffer de recepción está lleno
+        self.backlog: Dict[str, Deque[bytes]] = {}
+        self.retry: Optional[asyncio.TimerHandle] = None
+        self.overflows = 0
+
+    def open(self, receive: Callable[[bytes], None], flush_all: Callable) -> None:
+        self.receive = receive
+        self.flush_all = flush_all
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{os.getpid()}-{next(_bus_ids)}.sock")
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(self.path)
+        self.sock.setblocking(False)
+        self.loop = asyncio.get_running_loop()
+        self.loop.add_reader(self.sock.fileno(), self._on_readable)
+
+    def _on_readable(self) -> None:
+        while True:
+            try:
+                payload = self.sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            self.receive(payload)
+
+    def _peers(self) -> List[str]:
+        return [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".sock")
+            and os.path.join(self.directory, name) != self.path
+        ]
+
+    def send(self, payload: bytes) -> None:
+        for peer in self._peers():
+            queue = self.backlog.get(peer)
+            if queue:
+                # Se conserva el orden: detrás de lo que ya estaba esperando
+                self._enqueue(peer, queue, payload)
+            elif not self._send_to(peer, payload):
+                self.backlog[peer] = deque([payload])
+                self._schedule_retry()
+
+    def _send_to(self, peer: str, payload: bytes) -> bool:
+        # Devuelve False si el destino está lleno y hay que reintentar
+        try:
+            self.sock.sendto(payload, peer)
+        except (BlockingIOError, InterruptedError):
+            return False
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Worker terminado sin limpiar su socket
+            self.backlog.pop(peer, None)
+            try:
+                os.unlink(peer)
+            except OSError:
+                pass
+        return True
+
+    def _enqueue(self, peer: str, queue: Deque[bytes], payload: bytes) -> None:
+        if len(queue) < INVALIDATION_BACKLOG:
+            queue.append(payload)
+            return
+        # Demasiado atrasado: un único "borrar todo" sustituye lo pendiente
+        self.overflows += 1
+        queue.clear()
+        queue.append(self.flush_all())
+
+    def _schedule_retry(self) -> None:
+        if self.retry is None and self.loop is not None:
+            self.retry = self.loop.call_later(INVALIDATION_RETRY_SECONDS, self._flush)
+
+    def _flush(self) -> None:
+        self.retry = None
+        for peer, queue in list(self.backlog.items()):
+            while queue and self._send_to(peer, queue[0]):
+                queue.popleft()
+            if not queue:
+                self.backlog.pop(peer, None)
+        if self.backlog:
+            self._schedule_retry()
+
+    def close(self) -> None:
+        if self.retry is not None:
+            self.retry.cancel()
+            self.retry = None
+        if self.sock is not None:
+            if self.loop is not None and not self.loop.is_closed():
+                self.loop.remove_reader(self.sock.fileno())
+            self.sock.close()
+            self.sock = None
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+
+# --- Bus ---
+class InvalidationBus:
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.origin = f"{os.getpid()}-{next(_bus_ids)}"
+        self.subscribers: Dict[str, List[Callable[[InvalidationEvent], None]]] = {}
+        self.started = False
+        # Métricas
+        self.published = 0
+        self.received = 0
+        self.last_latency_seconds = 0.0
+        self.max_latency_seconds = 0.0
+
+    def subscribe(
+        self, entity: str, callback: Callable[[InvalidationEvent], None]
+    ) -> None:
+        self.subscribers.setdefault(entity, []).append(callback)
+
+    def start(self) -> None:
+        if self.started:
+            return
+        if self.backend is None:
+            self.backend = (
+                UnixSocketBackend()
+                if INVALIDATION_BACKEND == "unix"
+                else InProcessBackend()
+            )
+        self.backend.open(self._receive, self._flush_all_payload)
+        self.started = True
+
+    def publish(self, entity: str, entity_id: Optional[object] = None) -> None:
+        # Se llama después del commit; no espera a que los demás workers lo procesen
+        if not self.started:
+            self.start()
+        event = InvalidationEvent(
+            entity, entity_id, time.time_ns(), self.origin, local=True
+        )
+        self.published += 1
+        self._deliver(event)
+        self.backend.send(event.encode())
+
+    def close(self) -> None:
+        if self.started:
+            self.backend.close()
+            self.started = False
+
+    def _flush_all_payload(self) -> bytes:
+        return InvalidationEvent(ALL, None, time.time_ns(), self.origin).encode()
+
+    def _receive(self, payload: bytes) -> None:
+        try:
+            event = InvalidationEvent.decode(payload)
+        except ValueError as e:
+            print(f"Discarding malformed invalidation event: {str(e)}")
+            return
+        if event.origin == self.origin:
+            return
+        self.received += 1
+        latency = (time.time_ns() - event.version) / 1e9
+        self.last_latency_seconds = latency
+        self.max_latency_seconds = max(self.max_latency_seconds, latency)
+        self._deliver(event)
+
+    def _deliver(self, event: InvalidationEvent) -> None:
+        if event.entity == ALL:
+            callbacks = [
+                callback
+                for entity_callbacks in self.subscribers.values()
+                for callback in entity_callbacks
+            ]
+            event.entity_id = None
+        else:
+            callbacks = self.subscribers.get(event.entity, [])
+        for callback in callbacks:
+            callback(event)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "published": self.published,
+            "received": self.received,
+            "last_latency_seconds": self.last_latency_seconds,
+            "max_latency_seconds": self.max_latency_seconds,
+        }
+
+
+invalidation_bus = InvalidationBus()
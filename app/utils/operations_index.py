@@ -0,0 +1,241 @@
+import asyncio
+import os
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.database.crud as crud
+import app.models.py_schemas as py_schemas
+from app.utils.invalidation import OPERATION, InvalidationEvent, invalidation_bus
+
+
+# ======================================================
+#          ÍNDICE EN MEMORIA DE OPERACIONES ACTIVAS
+# ======================================================
+# `GET /operations` es la lectura más frecuente y no requiere autenticación.
+# En lugar de consultar y serializar todas las filas en cada llamada, el
+# proceso mantiene las operaciones activas en listas ordenadas (por id, fecha
+# límite, tasa y monto restante) junto con el JSON ya codificado de cada una.
+# Un listado (o una página con offset/limit) se arma concatenando esos
+# fragmentos y el cuerpo completo se guarda hasta la siguiente modificación,
+# así que las lecturas repetidas solo devuelven bytes ya construidos.
+#
+# Las rutas de escritura actualizan el índice de forma incremental después de
+# confirmar en la base de datos. Cada worker tiene su propio índice: las
+# escrituras hechas en otro proceso llegan por el bus de invalidación
+# (INVALIDATION_BACKEND=unix) y las operaciones afectadas se releen en la
+# siguiente lectura. Sin el bus, con varios workers puede desactivarse con
+# OPERATIONS_INDEX_ENABLED=0.
+
+OPERATIONS_INDEX_ENABLED = os.environ.get("OPERATIONS_INDEX_ENABLED", "1") == "1"
+
+# Órdenes disponibles para el listado (el id desempata y permite borrar por clave)
+SORT_KEYS: Dict[str, Callable[[py_schemas.Operation], tuple]] = {
+    "id": lambda op: (op.id,),
+    "deadline": lambda op: (op.deadline, op.id),
+    "interest_rate": lambda op: (op.interest_rate, op.id),
+    "remaining": lambda op: (op.amount_required - op.amount_collected, op.id),
+}
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _is_active(operation: py_schemas.Operation, today: date) -> bool:
+    # Mismo criterio que crud.get_active_operations (deadline > now)
+    return not operation.is_closed and operation.deadline > today
+
+
+@dataclass
+class IndexedOperation:
+    operation: py_schemas.Operation
+    encoded: bytes
+
+
+class ActiveOperationsIndex:
+    def __init__(self):
+        self.entries: Dict[int, IndexedOperation] = {}
+        # Por cada orden, las claves ordenadas y en paralelo el JSON de cada operación
+        self.sorted_keys: Dict[str, List[tuple]] = {name: [] for name in SORT_KEYS}
+        self.sorted_chunks: Dict[str, List[bytes]] = {name: [] for name in SORT_KEYS}
+        self.bodies: Dict[str, bytes] = {}
+        self.loaded = False
+        self.generation = 0
+        self.today: Optional[date] = None
+        self.lock = asyncio.Lock()
+        # Cambios que llegan mientras se carga el índice; se aplican al terminar
+        self.pending: Optional[List[Tuple[Callable, tuple]]] = None
+        # Operaciones modificadas por otro worker, pendientes de releer
+        self.stale: Set[int] = set()
+
+    # --- Lectura ---
+    async def listing(
+        self,
+        db: AsyncSession,
+        sort: str = "id",
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> bytes:
+        if not self.loaded:
+            await self.load(db)
+        while self.stale:
+            await self.refresh(db, self.stale.pop())
+        self._expire(_today())
+
+        chunks = self.sorted_chunks[sort]
+        if offset or limit is not None:
+            # Una página es un corte de la lista ya ordenada
+            end = None if limit is None else offset + limit
+            return b"[" + b",".join(chunks[offset:end]) + b"]"
+
+        body = self.bodies.get(sort)
+        if body is None:
+            body = self.bodies[sort] = b"[" + b",".join(chunks) + b"]"
+        return body
+
+    async def load(self, db: AsyncSession) -> None:
+        async with self.lock:
+            if self.loaded:
+                return
+            self.pending = []
+            generation = self.generation
+            try:
+                operations = await crud.get_active_operations(db)
+                self._clear()
+                self.today = _today()
+                self._bulk_insert(
+                    py_schemas.Operation.model_validate(operation)
+                    for operation in operations
+                )
+                for change, args in self.pending:
+                    change(*args)
+                # Si se invalidó durante la carga, la instantánea ya no sirve
+                self.loaded = generation == self.generation
+            finally:
+                self.pending = None
+
+    # --- Cambios incrementales ---
+    def upsert(self, operation) -> None:
+        self._apply(self._upsert, py_schemas.Operation.model_validate(operation))
+
+    def update_funding(
+        self, operation_id: int, amount_collected: float, is_closed: bool
+    ) -> None:
+        self._apply(
+            self._update_funding, operation_id, float(amount_collected), is_closed
+        )
+
+    def discard(self, operation_id: int) -> None:
+        self._apply(self._discard, operation_id)
+
+    async def refresh(self, db: AsyncSession, operation_id: int) -> None:
+        # Relee la operación tras una escritura que cambia su estado indirectamente
+        operation = await crud.get_operation_by_id(db, operation_id)
+        if operation is None:
+            self.discard(operation_id)
+        else:
+            self.upsert(operation)
+
+    def invalidate(self) -> None:
+        # Cambios masivos (expiraciones, borrado de usuarios): se recarga al leer
+        self.loaded = False
+        self.generation += 1
+        self.stale.clear()
+        self._clear()
+
+    def on_invalidation(self, event: InvalidationEvent) -> None:
+        # Los cambios de este proceso ya se aplicaron desde las rutas
+        if event.local:
+            return
+        if event.entity_id is None:
+            self.invalidate()
+        elif self.loaded or self.pending is not None:
+            self.stale.add(event.entity_id)
+
+    # --- Internos ---
+    def _apply(self, change: Callable, *args) -> None:
+        if self.pending is not None:
+            self.pending.append((change, args))
+        elif self.loaded:
+            change(*args)
+
+    def _clear(self) -> None:
+        self.entries.clear()
+        for name in SORT_KEYS:
+            self.sorted_keys[name].clear()
+            self.sorted_chunks[name].clear()
+        self.bodies.clear()
+
+    def _bulk_insert(self, operations: Iterable[py_schemas.Operation]) -> None:
+        # Carga inicial: se ordena una sola vez en lugar de insertar fila a fila
+        for operation in operations:
+            if _is_active(operation, self.today):
+                self.entries[operation.id] = IndexedOperation(
+                    operation, operation.model_dump_json().encode()
+                )
+        for name, sort_key in SORT_KEYS.items():
+            ordered = sorted(
+                (
+                    (sort_key(entry.operation), entry.encoded)
+                    for entry in self.entries.values()
+                ),
+                key=lambda item: item[0],
+            )
+            self.sorted_keys[name] = [key for key, _ in ordered]
+            self.sorted_chunks[name] = [encoded for _, encoded in ordered]
+
+    def _upsert(self, operation: py_schemas.Operation) -> None:
+        self._discard(operation.id)
+        if not _is_active(operation, self.today or _today()):
+            return
+        entry = IndexedOperation(operation, operation.model_dump_json().encode())
+        self.entries[operation.id] = entry
+        for name, sort_key in SORT_KEYS.items():
+            key = sort_key(operation)
+            keys = self.sorted_keys[name]
+            position = bisect_left(keys, key)
+            keys.insert(position, key)
+            self.sorted_chunks[name].insert(position, entry.encoded)
+        self.bodies.clear()
+
+    def _update_funding(
+        self, operation_id: int, amount_collected: float, is_closed: bool
+    ) -> None:
+        entry = self.entries.get(operation_id)
+        if entry is not None:
+            self._upsert(
+                entry.operation.model_copy(
+                    update={
+                        "amount_collected": amount_collected,
+                        "is_closed": is_closed,
+                    }
+                )
+            )
+
+    def _discard(self, operation_id: int) -> None:
+        entry = self.entries.pop(operation_id, None)
+        if entry is None:
+            return
+        for name, sort_key in SORT_KEYS.items():
+            keys = self.sorted_keys[name]
+            position = bisect_left(keys, sort_key(entry.operation))
+            del keys[position]
+            del self.sorted_chunks[name][position]
+        self.bodies.clear()
+
+    def _expire(self, today: date) -> None:
+        # Las operaciones salen del listado al llegar su fecha límite
+        if self.today == today:
+            return
+        self.today = today
+        by_deadline = self.sorted_keys["deadline"]
+        while by_deadline and by_deadline[0][0] <= today:
+            self._discard(by_deadline[0][1])
+
+
+operations_index = ActiveOperationsIndex()
+invalidation_bus.subscribe(OPERATION, operations_index.on_invalidation)
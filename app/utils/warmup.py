@@ -0,0 +1,144 @@
+import asyncio
+import os
+import time
+from typing import Dict, Optional
+
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import sessionmaker
+
+import app.database.crud as crud
+import app.models.py_schemas as py_schemas
+from app.utils.operations_index import OPERATIONS_INDEX_ENABLED, operations_index
+
+
+# ======================================================
+#              CALENTAMIENTO AL ARRANCAR
+# ======================================================
+# Las primeras peticiones tras un despliegue pagan costes de una sola vez:
+# abrir las conexiones del pool, compilar las sentencias de crud.py, generar
+# los esquemas, cargar el índice de operaciones activas e inicializar bcrypt.
+# Al arrancar se lanza una tarea que hace todo eso antes de que llegue
+# tráfico real; `GET /health/ready` responde 503 hasta que termina, para que
+# el balanceador no envíe peticiones a un worker todavía frío.
+
+WARMUP_ENABLED = os.environ.get("WARMUP_ENABLED", "1") == "1"
+WARMUP_CONNECTIONS = int(os.environ.get("WARMUP_CONNECTIONS", "5"))
+WARMUP_RETRY_SECONDS = 2.0
+
+
+class Warmup:
+    def __init__(self, enabled: bool = WARMUP_ENABLED):
+        self.enabled = enabled
+        self.ready = not enabled
+        self.task: Optional[asyncio.Task] = None
+        self.error: Optional[str] = None
+        # Segundos por fase
+        self.timings: Dict[str, float] = {}
+
+    def start(
+        self,
+        app: FastAPI,
+        engine: AsyncEngine,
+        session_factory: sessionmaker,
+        connections: int = WARMUP_CONNECTIONS,
+    ) -> None:
+        if not self.enabled or self.task is not None:
+            return
+        self.task = asyncio.create_task(
+            self._run(app, engine, session_factory, connections)
+        )
+
+    async def stop(self) -> None:
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self.task = None
+
+    async def _run(self, app, engine, session_factory, connections) -> None:
+        # Si la base de datos aún no responde se reintenta; sigue sin estar listo
+        while True:
+            try:
+                await self.run(app, engine, session_factory, connections)
+                return
+            except (SQLAlchemyError, OSError) as e:
+                self.error = str(e)
+                print(f"Warm-up failed, retrying: {str(e)}")
+                await asyncio.sleep(WARMUP_RETRY_SECONDS)
+
+    async def run(self, app, engine, session_factory, connections) -> None:
+        await self._phase("pool", open_connections(engine, connections))
+        await self._phase("statements", compile_statements(session_factory))
+        await self._phase("schemas", build_schemas(app))
+        await self._phase("operations_index", load_operations_index(session_factory))
+        await self._phase(
+            "bcrypt", asyncio.to_thread(crud.get_password_hash, "warm-up")
+        )
+        self.error = None
+        self.ready = True
+
+    async def _phase(self, name: str, work) -> None:
+        start = time.perf_counter()
+        await work
+        self.timings[name] = time.perf_counter() - start
+
+    def status(self) -> dict:
+        return {
+            "status": "ready" if self.ready else "warming_up",
+            "warmup_seconds": self.timings,
+            "error": self.error,
+        }
+
+
+# --- Fases ---
+async def open_connections(engine: AsyncEngine, count: int) -> None:
+    # Se abren a la vez para que queden `count` conexiones distintas en el pool
+    connections = await asyncio.gather(*(engine.connect() for _ in range(count)))
+    try:
+        for conn in connections:
+            await conn.execute(text("SELECT 1"))
+    finally:
+        for conn in connections:
+            await conn.close()
+
+
+async def compile_statements(session_factory: sessionmaker) -> None:
+    # Ejecuta las lecturas calientes con claves inexistentes: no devuelven filas
+    # pero dejan cada sentencia compilada en la caché del motor
+    async with session_factory() as db:
+        await crud.get_user_by_username(db, "")
+        await crud.get_user_by_id(db, "")
+        await crud.get_operation_by_id(db, 0)
+        await crud.get_bid_by_id(db, 0)
+        await crud.get_bids_by_operation_id(db, 0)
+        await crud.get_bid_by_investor_and_operation(db, "", 0)
+        await crud.get_idempotency_record(db, "")
+
+
+async def build_schemas(app: FastAPI) -> None:
+    # El esquema OpenAPI se genera la primera vez que se pide /docs
+    app.openapi()
+    for schema in (
+        py_schemas.User,
+        py_schemas.Operation,
+        py_schemas.OperationDetail,
+        py_schemas.Bid,
+        py_schemas.BidResponse,
+        py_schemas.Portfolio,
+        py_schemas.OperatorDashboard,
+    ):
+        schema.model_json_schema()
+
+
+async def load_operations_index(session_factory: sessionmaker) -> None:
+    if OPERATIONS_INDEX_ENABLED:
+        async with session_factory() as db:
+            await operations_index.listing(db)
+
+
+warmup = Warmup()
@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+
+from sqlalchemy import and_, select
+
+import app.database.crud as crud
+import app.database.sql_models as sql_models
+from app.database import statement_stats
+from benchmarks.common import bench_database, seed_operation, seed_users, timer
+
+
+# ======================================================
+#   Benchmark: consultas calientes de crud antes/después
+# ======================================================
+# "before" reproduce las consultas construyendo un select() nuevo en cada
+# llamada; "after" usa las funciones actuales de crud.py (lambda_stmt).
+#
+#   python -m benchmarks.bench_crud --calls 5000
+
+
+async def before_get_user_by_username(db, username):
+    result = await db.execute(
+        select(sql_models.User).filter(sql_models.User.username == username)
+    )
+    return result.scalars().first()
+
+
+async def before_get_operation_by_id(db, operation_id):
+    result = await db.execute(
+        select(sql_models.Operation).filter(sql_models.Operation.id == operation_id)
+    )
+    return result.scalars().first()
+
+
+async def before_get_bid_by_investor_and_operation(db, investor_id, operation_id):
+    result = await db.execute(
+        select(sql_models.Bid).where(
+            and_(
+                sql_models.Bid.investor_id == investor_id,
+                sql_models.Bid.operation_id == operation_id,
+            )
+        )
+    )
+    return result.scalars().first()
+
+
+ROUNDS = 3
+
+CASES = (
+    (
+        "get_user_by_username",
+        before_get_user_by_username,
+        crud.get_user_by_username,
+        lambda i: (f"inv-{i % 100}",),
+    ),
+    (
+        "get_operation_by_id",
+        before_get_operation_by_id,
+        crud.get_operation_by_id,
+        lambda i: (1,),
+    ),
+    (
+        "get_bid_by_investor_and_operation",
+        before_get_bid_by_investor_and_operation,
+        crud.get_bid_by_investor_and_operation,
+        lambda i: (f"inv-{i % 100}", 1),
+    ),
+)
+
+
+async def run(calls: int) -> None:
+    async with bench_database() as (engine, session_factory):
+        statement_stats.install(engine.sync_engine)
+        async with session_factory() as db:
+            await seed_users(db, 1, "operador", "op")
+            await seed_users(db, 100, "inversor", "inv")
+            await seed_operation(db, 1, "op-0", 1000)
+
+        print(f"{'function':<36}{'before us':>11}{'after us':>11}{'compiles':>10}")
+        for name, before, after, args in CASES:
+            results = [float("inf"), float("inf")]
+            # Mejor de varias rondas alternadas para reducir el ruido
+            for _ in range(ROUNDS):
+                for position, function in enumerate((before, after)):
+                    async with session_factory() as db:
+                        await function(db, *args(0))  # calentamiento
+                        statement_stats.reset_statement_stats()
+                        with timer() as elapsed:
+                            for i in range(calls):
+                                await function(db, *args(i))
+                    per_call = elapsed["seconds"] / calls * 1e6
+                    results[position] = min(results[position], per_call)
+            compilations = sum(
+                stats["compilations"]
+                for stats in statement_stats.get_statement_stats().values()
+            )
+            print(f"{name:<36}{results[0]:>11.1f}{results[1]:>11.1f}{compilations:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls))
@@ -0,0 +1,61 @@
+import argparse
+import asyncio
+from types import SimpleNamespace
+
+import app.database.crud as crud
+import app.models.py_schemas as py_schemas
+from app.database.bid_coalescer import BidCoalescer
+from benchmarks.common import bench_database, seed_operation, seed_users, timer
+
+
+# ======================================================
+#     Benchmark: ofertas concurrentes sobre una operación
+# ======================================================
+# Compara el camino original (INSERT + commit y luego lectura/UPDATE + commit
+# por oferta, serializado por el bloqueo de la fila de la operación) con el
+# coalescer, que confirma cada lote con un INSERT multi-fila y un solo commit.
+#
+#   python -m benchmarks.bench_hot_operation --bids 1000
+
+
+async def per_bid_path(session_factory, bids: int) -> float:
+    row_lock = asyncio.Lock()
+
+    async def place(i: int) -> None:
+        data = py_schemas.BidCreate(operation_id=1, amount=1, interest_rate=4.0)
+        investor = SimpleNamespace(id=f"inv-{i}")
+        async with row_lock, session_factory() as db:
+            await crud.create_bid(db, data, investor)
+            await crud.update_operation_amount_collected(db, 1, data.amount)
+
+    with timer() as elapsed:
+        await asyncio.gather(*(place(i) for i in range(bids)))
+    return elapsed["seconds"]
+
+
+async def coalesced_path(session_factory, bids: int) -> float:
+    coalescer = BidCoalescer(session_factory)
+    with timer() as elapsed:
+        await asyncio.gather(
+            *(coalescer.submit(1, f"inv-{i}", 1, 4.0) for i in range(bids))
+        )
+    return elapsed["seconds"]
+
+
+async def run(bids: int) -> None:
+    print(f"{'path':<12}{'bids':>8}{'seconds':>10}{'bids/s':>12}")
+    for name, path in (("per-bid", per_bid_path), ("coalesced", coalesced_path)):
+        async with bench_database() as (engine, session_factory):
+            async with session_factory() as db:
+                await seed_users(db, 1, "operador", "op")
+                await seed_users(db, bids, "inversor", "inv")
+                await seed_operation(db, 1, "op-0", bids)
+            seconds = await path(session_factory, bids)
+        print(f"{name:<12}{bids:>8}{seconds:>10.3f}{bids / seconds:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bids", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args.bids))
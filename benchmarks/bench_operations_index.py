@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import json
+import uuid
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert
+
+import app.database.crud as crud
+import app.database.sql_models as sql_models
+import app.models.py_schemas as py_schemas
+from app.utils.operations_index import ActiveOperationsIndex
+from benchmarks.common import bench_database, timer
+
+
+# ======================================================
+#     Benchmark: listado de operaciones activas
+# ======================================================
+# Compara el listado original (consulta + serialización de cada fila en cada
+# llamada) con el índice en memoria: lectura con el cuerpo ya armado, una
+# página de 50 y el listado completo justo después de una modificación (se
+# vuelve a concatenar).
+#
+#   python -m benchmarks.bench_operations_index --operations 100000
+
+
+async def seed_operations(db, count: int) -> None:
+    operator_id = str(uuid.uuid4())
+    db.add(
+        sql_models.User(
+            id=operator_id,
+            username="op",
+            password_hash="x",
+            role="operador",
+            created_at=datetime(2024, 1, 1),
+        )
+    )
+    await db.execute(
+        insert(sql_models.Operation),
+        [
+            {
+                "id": i,
+                "operator_id": operator_id,
+                "amount_required": 1000 + i % 500,
+                "interest_rate": 1 + (i * 7919 % 1000) / 100,
+                "deadline": date(2100, 1, 1) + timedelta(days=i % 3650),
+                "amount_collected": i % 300,
+                "is_closed": False,
+                "created_at": datetime(2024, 1, 1),
+            }
+            for i in range(1, count + 1)
+        ],
+    )
+    await db.commit()
+
+
+async def query_listing(db) -> bytes:
+    operations = await crud.get_active_operations(db)
+    return json.dumps(
+        [
+            py_schemas.Operation.model_validate(op).model_dump(mode="json")
+            for op in operations
+        ],
+        separators=(",", ":"),
+    ).encode()
+
+
+async def measure(calls: int, listing) -> float:
+    with timer() as elapsed:
+        for i in range(calls):
+            await listing(i)
+    return elapsed["seconds"] / calls
+
+
+async def run(operations: int, calls: int) -> None:
+    async with bench_database() as (engine, session_factory):
+        async with session_factory() as db:
+            await seed_operations(db, operations)
+
+        async with session_factory() as db:
+            index = ActiveOperationsIndex()
+            with timer() as load:
+                await index.load(db)
+
+            async def query(i):
+                db.expunge_all()
+                await query_listing(db)
+
+            async def cached(i):
+                await index.listing(db, "deadline")
+
+            async def page(i):
+                await index.listing(db, "deadline", (i * 50) % operations, 50)
+
+            async def after_change(i):
+                index.update_funding(1 + i % operations, i % 300, False)
+                await index.listing(db, "deadline")
+
+            results = (
+                ("query", await measure(max(1, calls // 100), query)),
+                ("index cached", await measure(calls, cached)),
+                ("index page 50", await measure(calls, page)),
+                ("index changed", await measure(max(1, calls // 10), after_change)),
+            )
+
+    print(f"operations: {operations}  index load: {load['seconds']:.2f}s")
+    print(f"{'path':<16}{'ms/listing':>12}")
+    for name, seconds in results:
+        print(f"{name:<16}{seconds * 1000:>12.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--operations", type=int, default=100_000)
+    parser.add_argument("--calls", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args.operations, args.calls))
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager, contextmanager
+from datetime import date, datetime
+from typing import AsyncIterator, Iterator, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.database.sql_models as sql_models
+from app.database.database import Base
+
+
+# ======================================================
+#          Utilidades compartidas por los benchmarks
+# ======================================================
+# Por defecto se usa un archivo SQLite temporal (con fsync en cada commit), o
+# la base indicada en BENCH_DATABASE_URL para medir contra MySQL.
+BENCH_DATABASE_URL = os.environ.get("BENCH_DATABASE_URL")
+
+
+@asynccontextmanager
+async def bench_database() -> AsyncIterator[Tuple[AsyncEngine, sessionmaker]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = BENCH_DATABASE_URL or f"sqlite+aiosqlite:///{tmp}/bench.db"
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(
+            bind=engine, class_=AsyncSession, autocommit=False, autoflush=False
+        )
+        try:
+            yield engine, session_factory
+        finally:
+            await engine.dispose()
+
+
+async def seed_users(db: AsyncSession, count: int, role: str, prefix: str) -> None:
+    # Un único hash precalculado: el benchmark no mide bcrypt
+    await db.execute(
+        insert(sql_models.User),
+        [
+            {
+                "id": f"{prefix}-{i}",
+                "username": f"{prefix}-{i}",
+                "password_hash": "x",
+                "role": role,
+                "created_at": datetime(2024, 1, 1),
+            }
+            for i in range(count)
+        ],
+    )
+    await db.commit()
+
+
+async def seed_operation(
+    db: AsyncSession, operation_id: int, operator_id: str, amount_required: float
+) -> None:
+    db.add(
+        sql_models.Operation(
+            id=operation_id,
+            operator_id=operator_id,
+            amount_required=amount_required,
+            interest_rate=5.0,
+            deadline=date(2100, 1, 1),
+            amount_collected=0,
+            is_closed=False,
+            created_at=datetime(2024, 1, 1),
+        )
+    )
+    await db.commit()
+
+
+@contextmanager
+def timer() -> Iterator[dict]:
+    elapsed = {}
+    start = time.perf_counter()
+    try:
+        yield elapsed
+    finally:
+        elapsed["seconds"] = time.perf_counter() - start
@@ -17,8 +17,11 @@ CREATE TABLE operations (
     amount_collected DECIMAL(15, 2) DEFAULT 0,  -- Monto recaudado a través de las pujas
     is_closed BOOLEAN DEFAULT FALSE,  -- Indica si la operación está cerrada
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (operator_id) REFERENCES users(id) ON DELETE CASCADE
+    FOREIGN KEY (operator_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_operations_operator_closed_deadline (operator_id, is_closed, deadline)  -- Panel del operador
 );
+-- En bases ya creadas:
+-- CREATE INDEX idx_operations_operator_closed_deadline ON operations (operator_id, is_closed, deadline);
 
 
 CREATE TABLE bids (
@@ -29,5 +32,42 @@ CREATE TABLE bids (
     interest_rate DECIMAL(5, 2) NOT NULL,  -- Interés solicitado por el inversor
     bid_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,  -- Fecha de la puja
     FOREIGN KEY (operation_id) REFERENCES operations(id) ON DELETE CASCADE,
-    FOREIGN KEY (investor_id) REFERENCES users(id) ON DELETE CASCADE
-);
\ No newline at end of file
+    FOREIGN KEY (investor_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_bids_investor_bid_date (investor_id, bid_date)  -- Cartera del inversor (GET /me/bids)
+);
+-- En bases ya creadas:
+-- CREATE INDEX idx_bids_investor_bid_date ON bids (investor_id, bid_date);
+
+-- Resumen por operador para GET /me/operations, recalculado en cada escritura
+CREATE TABLE operator_summaries (
+    operator_id VARCHAR(36) PRIMARY KEY,
+    operation_count INT NOT NULL DEFAULT 0,
+    open_operation_count INT NOT NULL DEFAULT 0,
+    amount_required_total DECIMAL(17, 2) NOT NULL DEFAULT 0,
+    amount_collected_total DECIMAL(17, 2) NOT NULL DEFAULT 0,
+    bid_count INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (operator_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Registro de auditoría (AUDIT_SINK=db): ofertas creadas y retiradas, cierres de operaciones
+CREATE TABLE audit_events (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    event_type VARCHAR(30) NOT NULL,  -- bid_placed, bid_withdrawn, operation_closed
+    operation_id INT NOT NULL,  -- Sin clave foránea: el registro sobrevive a los borrados
+    bid_id INT,
+    actor_id VARCHAR(36),
+    amount DECIMAL(15, 2),
+    occurred_at TIMESTAMP NOT NULL,
+    INDEX idx_audit_events_operation_id (operation_id)
+);
+
+-- Opcional: respuestas guardadas por clave de idempotencia (IDEMPOTENCY_DB_ENABLED=1)
+CREATE TABLE idempotency_keys (
+    `key` VARCHAR(64) PRIMARY KEY,  -- SHA-256 de método, ruta, usuario y clave
+    request_hash VARCHAR(64) NOT NULL,  -- SHA-256 del cuerpo de la petición original
+    status_code INT NOT NULL,
+    content_type VARCHAR(100),
+    body BLOB NOT NULL,  -- Respuesta original
+    expires_at TIMESTAMP NOT NULL,
+    INDEX idx_idempotency_expires_at (expires_at)
+);
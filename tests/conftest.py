@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database.database import Base
+import app.database.sql_models  # noqa: F401  (registra las tablas en Base)
+
+
+# ======================================================
+#        Base de datos embebida para las pruebas
+# ======================================================
+# Ejecuta una corrutina `scenario(db)` contra una base SQLite en memoria
+# con todas las tablas creadas. Permite probar consultas reales sin MySQL.
+@pytest.fixture
+def run_db():
+    def runner(scenario):
+        async def main():
+            engine = create_async_engine(
+                "sqlite+aiosqlite://",
+                connect_args={"check_same_thread": False},
+                poolclass=StaticPool,
+            )
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            session_factory = sessionmaker(
+                bind=engine, class_=AsyncSession, autocommit=False, autoflush=False
+            )
+            try:
+                async with session_factory() as db:
+                    return await scenario(db)
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return runner
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app.main import app
+from app.utils.admission import AdmissionGate, UserRateLimiter, user_rate_limiter
+from app.utils.token_generator import create_access_token
+
+client = TestClient(app)
+
+
+# ======================================================
+#                TEST UserRateLimiter
+# ======================================================
+def test_rate_limiter_rejects_after_burst_with_retry_after():
+    limiter = UserRateLimiter(rate=1, burst=2)
+    limiter.check("user:a")
+    limiter.check("user:a")
+
+    with pytest.raises(HTTPException) as exc:
+        limiter.check("user:a")
+
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "1"
+
+    # Otro usuario tiene su propio bucket
+    limiter.check("user:b")
+
+
+def test_rate_limiter_bounds_tracked_users():
+    limiter = UserRateLimiter(rate=1, burst=1, max_users=2)
+    for key in ("a", "b", "c"):
+        limiter.check(key)
+    assert list(limiter.buckets) == ["b", "c"]
+
+
+# ======================================================
+#                  TEST AdmissionGate
+# ======================================================
+def test_gate_sheds_when_queue_is_full():
+    async def scenario():
+        gate = AdmissionGate("test", max_concurrent=1, max_queue=1, timeout=1)
+        await gate.acquire()
+        queued = asyncio.create_task(gate.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(HTTPException) as exc:
+            await gate.acquire()
+        assert exc.value.status_code == 503
+        assert "Retry-After" in exc.value.headers
+
+        # Al liberar, el cupo pasa al que estaba en cola
+        gate.release()
+        await queued
+        return gate.stats()
+
+    assert asyncio.run(scenario()) == {"active": 1, "queued": 0, "rejected": 1}
+
+
+def test_gate_times_out_waiting():
+    async def scenario():
+        gate = AdmissionGate("test", max_concurrent=1, max_queue=5, timeout=0.01)
+        await gate.acquire()
+        with pytest.raises(HTTPException) as exc:
+            await gate.acquire()
+        gate.release()
+        return exc.value.status_code, gate.stats()
+
+    assert asyncio.run(scenario()) == (503, {"active": 0, "queued": 0, "rejected": 1})
+
+
+# ======================================================
+#            TEST POST /bid con límite por usuario
+# ======================================================
+def test_bid_route_returns_429_when_user_exceeds_rate():
+    token = create_access_token(data={"sub": "inversor_test", "role": "inversor"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with patch.object(user_rate_limiter, "buckets", {}), patch.object(
+        user_rate_limiter, "burst", 0
+    ):
+        response = client.post(
+            "/bid",
+            json={"operation_id": 1, "amount": 10, "interest_rate": 5},
+            headers=headers,
+        )
+
+    assert response.status_code == 429
+    assert "retry-after" in response.headers
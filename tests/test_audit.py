@@ -0,0 +1,236 @@
+import asyncio
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.database.sql_models as sql_models
+import app.main as main
+import app.routers.bids as bids_router
+import app.utils.audit as audit
+from app.database.bid_coalescer import BidCoalescer
+from app.database.database import Base
+from app.dependencies import get_current_user, get_db
+from app.main import app
+
+OPERATOR_ID = "00000000-0000-0000-0000-000000000001"
+INVESTOR_ID = "00000000-0000-0000-0000-000000000002"
+
+
+class MemorySink:
+    def __init__(self, delay=0.0, failures=0):
+        self.batches = []
+        self.delay = delay
+        self.failures = failures
+
+    async def write(self, events):
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk unavailable")
+        self.batches.append(
+            [(event.event_type, event.operation_id) for event in events]
+        )
+
+
+async def seed(db):
+    for user_id, role in ((OPERATOR_ID, "operador"), (INVESTOR_ID, "inversor")):
+        db.add(
+            sql_models.User(
+                id=user_id,
+                username=user_id,
+                password_hash="x",
+                role=role,
+                created_at=datetime(2024, 1, 1),
+            )
+        )
+    db.add(
+        sql_models.Operation(
+            id=1,
+            operator_id=OPERATOR_ID,
+            amount_required=500,
+            interest_rate=5.0,
+            deadline=date(2100, 1, 1),
+            amount_collected=0,
+            is_closed=False,
+            created_at=datetime(2024, 1, 1),
+        )
+    )
+    await db.commit()
+
+
+# ======================================================
+#                    TEST AuditLog
+# ======================================================
+def test_events_are_batched_and_drained():
+    async def scenario():
+        sink = MemorySink()
+        log = audit.AuditLog(sink, flush_interval=0.05)
+        for i in range(5):
+            await log.record(audit.BID_PLACED, i)
+        pending = log.stats()["pending"]
+        await log.drain()
+        return sink.batches, pending, log.stats()
+
+    batches, pending, stats = asyncio.run(scenario())
+
+    assert pending == 5
+    assert batches == [[(audit.BID_PLACED, i) for i in range(5)]]
+    assert (stats["written"], stats["batches"], stats["pending"]) == (5, 1, 0)
+    assert stats["queue_lag_seconds"] == 0.0
+    assert stats["max_lag_seconds"] >= stats["last_lag_seconds"] > 0
+
+
+def test_full_queue_applies_backpressure_without_losing_events():
+    async def scenario():
+        sink = MemorySink(delay=0.01)
+        log = audit.AuditLog(sink, queue_size=2, batch_size=2, flush_interval=0)
+        for i in range(10):
+            await log.record(audit.BID_WITHDRAWN, i)
+        await log.drain()
+        return sink.batches, log.stats()
+
+    batches, stats = asyncio.run(scenario())
+
+    assert [operation for batch in batches for _, operation in batch] == list(range(10))
+    assert stats["backpressure_waits"] > 0
+
+
+def test_failed_batches_are_retried(monkeypatch):
+    monkeypatch.setattr(audit, "AUDIT_RETRY_SECONDS", 0.01)
+
+    async def scenario():
+        sink = MemorySink(failures=2)
+        log = audit.AuditLog(sink, flush_interval=0)
+        await log.record(audit.OPERATION_CLOSED, 7)
+        await log.drain()
+        return sink.batches, log.stats()["failures"]
+
+    assert asyncio.run(scenario()) == ([[(audit.OPERATION_CLOSED, 7)]], 2)
+
+
+def test_disabled_log_records_nothing():
+    async def scenario():
+        log = audit.AuditLog(MemorySink(), enabled=False)
+        await log.record(audit.BID_PLACED, 1)
+        return log.task, log.stats()["enqueued"]
+
+    assert asyncio.run(scenario()) == (None, 0)
+
+
+# ======================================================
+#                 TEST destinos de auditoría
+# ======================================================
+def test_file_sink_appends_segments_with_one_fsync_per_batch(tmp_path, monkeypatch):
+    fsyncs = []
+    real_fsync = audit.os.fsync
+    monkeypatch.setattr(audit.os, "fsync", lambda fd: fsyncs.append(real_fsync(fd)))
+
+    async def scenario():
+        sink = audit.FileAuditSink(str(tmp_path), segment_bytes=200)
+        await sink.write(
+            [audit.AuditEvent(audit.BID_PLACED, 1, amount=Decimal("10"))] * 3
+        )
+        await sink.write([audit.AuditEvent(audit.BID_WITHDRAWN, 1)])
+        sink.close()
+
+    asyncio.run(scenario())
+
+    segments = sorted(path.name for path in tmp_path.iterdir())
+    first = (tmp_path / segments[0]).read_text().splitlines()
+    assert segments == ["audit-000001.jsonl", "audit-000002.jsonl"]
+    assert len(fsyncs) == 2
+    assert [json.loads(line)["event_type"] for line in first] == [audit.BID_PLACED] * 3
+    assert json.loads(first[0])["amount"] == "10"
+
+
+def test_database_sink_writes_multi_row_insert(run_db):
+    async def scenario(db):
+        sink = audit.DatabaseAuditSink(sessionmaker(bind=db.bind, class_=AsyncSession))
+        await sink.write(
+            [audit.AuditEvent(audit.BID_PLACED, 1, bid_id=i) for i in range(3)]
+        )
+        result = await db.execute(select(sql_models.AuditEvent.bid_id))
+        return result.scalars().all()
+
+    assert run_db(scenario) == [0, 1, 2]
+
+
+# ======================================================
+#           TEST eventos emitidos por las escrituras
+# ======================================================
+def test_coalescer_records_placements_and_close(run_db):
+    async def scenario(db):
+        await seed(db)
+        sink = MemorySink()
+        log = audit.AuditLog(sink, flush_interval=0)
+        coalescer = BidCoalescer(
+            sessionmaker(bind=db.bind, class_=AsyncSession), audit=log
+        )
+        await coalescer.submit(1, INVESTOR_ID, 500, 4.0)
+        await log.drain()
+        return [event for batch in sink.batches for event in batch]
+
+    assert run_db(scenario) == [(audit.BID_PLACED, 1), (audit.OPERATION_CLOSED, 1)]
+
+
+def test_bid_withdrawal_route_records_event(tmp_path, monkeypatch):
+    url = f"sqlite+aiosqlite:///{tmp_path}/audit.db"
+
+    async def prepare():
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with sessionmaker(bind=engine, class_=AsyncSession)() as db:
+            await seed(db)
+            db.add(
+                sql_models.Bid(
+                    id=1,
+                    operation_id=1,
+                    investor_id=INVESTOR_ID,
+                    amount=100,
+                    interest_rate=4.0,
+                    bid_date=datetime(2024, 1, 1),
+                )
+            )
+            await db.execute(
+                sql_models.Operation.__table__.update().values(amount_collected=100)
+            )
+            await db.commit()
+        await engine.dispose()
+
+    asyncio.run(prepare())
+
+    engine = create_async_engine(url)
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession)
+
+    async def override_db():
+        async with session_factory() as db:
+            yield db
+
+    sink = MemorySink()
+    log = audit.AuditLog(sink, flush_interval=0)
+    monkeypatch.setattr(bids_router, "audit_log", log)
+    # El arranque y el apagado de la app usan el mismo motor SQLite
+    monkeypatch.setattr(main, "engine", engine)
+    monkeypatch.setattr(main.warmup, "enabled", False)
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(
+        id=INVESTOR_ID, role="inversor"
+    )
+    try:
+        with TestClient(app) as client:
+            response = client.delete(
+                "/bid/1", headers={"Authorization": "Bearer token"}
+            )
+            client.portal.call(log.drain)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 204
+    assert sink.batches == [[(audit.BID_WITHDRAWN, 1)]]
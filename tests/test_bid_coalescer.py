@@ -0,0 +1,142 @@
+import asyncio
+from datetime import date, datetime
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+import app.database.sql_models as sql_models
+from app.database.bid_coalescer import BidCoalescer
+
+
+async def seed(db, amount_required=1000, deadline=date(2100, 1, 1)):
+    db.add(
+        sql_models.User(
+            id="op-1",
+            username="op-1",
+            password_hash="x",
+            role="operador",
+            created_at=datetime(2024, 1, 1),
+        )
+    )
+    db.add(
+        sql_models.Operation(
+            id=1,
+            operator_id="op-1",
+            amount_required=amount_required,
+            interest_rate=5.0,
+            deadline=deadline,
+            amount_collected=0,
+            is_closed=False,
+            created_at=datetime(2024, 1, 1),
+        )
+    )
+    await db.commit()
+
+
+def make_coalescer(db, **kwargs):
+    session_factory = sessionmaker(bind=db.bind, class_=AsyncSession)
+    coalescer = BidCoalescer(session_factory, **kwargs)
+
+    # Cuenta los lotes confirmados
+    coalescer.batches = []
+    commit_batch = coalescer._commit_batch
+
+    async def counting_commit_batch(operation_id, batch):
+        coalescer.batches.append(len(batch))
+        await commit_batch(operation_id, batch)
+
+    coalescer._commit_batch = counting_commit_batch
+    return coalescer
+
+
+async def outcome(coroutine):
+    try:
+        bid = await coroutine
+        return bid.investor_id, float(bid.amount)
+    except HTTPException as e:
+        return e.status_code, e.detail
+
+
+async def operation_state(db):
+    db.expire_all()
+    result = await db.execute(select(sql_models.Operation))
+    operation = result.scalar_one()
+    return float(operation.amount_collected), operation.is_closed
+
+
+# ======================================================
+#                  TEST BidCoalescer
+# ======================================================
+def test_concurrent_bids_are_validated_in_order_and_committed_once(run_db):
+    async def scenario(db):
+        await seed(db)
+        coalescer = make_coalescer(db, window=0.01)
+        results = await asyncio.gather(
+            outcome(coalescer.submit(1, "inv-a", 300, 4.0)),
+            outcome(coalescer.submit(1, "inv-b", 300, 4.5)),
+            outcome(coalescer.submit(1, "inv-a", 100, 4.0)),
+            outcome(coalescer.submit(1, "inv-c", 500, 4.0)),
+            outcome(coalescer.submit(1, "inv-d", 0, 4.0)),
+        )
+        return results, coalescer.batches, await operation_state(db)
+
+    results, batches, state = run_db(scenario)
+
+    assert results == [
+        ("inv-a", 300.0),
+        ("inv-b", 300.0),
+        (400, "User has already bid this operation"),
+        (400, "Amount of the bid exceeds the value"),
+        (400, "Amount of the bid must be greater than zero"),
+    ]
+    assert batches == [5]
+    assert state == (600.0, False)
+
+
+def test_operation_closes_when_fully_funded(run_db):
+    async def scenario(db):
+        await seed(db, amount_required=500)
+        coalescer = make_coalescer(db)
+        results = await asyncio.gather(
+            outcome(coalescer.submit(1, "inv-a", 200, 4.0)),
+            outcome(coalescer.submit(1, "inv-b", 300, 4.0)),
+            outcome(coalescer.submit(1, "inv-c", 1, 4.0)),
+        )
+        return results, await operation_state(db)
+
+    results, state = run_db(scenario)
+
+    assert results[2] == (400, "Operation is closed")
+    assert state == (500.0, True)
+
+
+def test_batches_are_capped_by_size(run_db):
+    async def scenario(db):
+        await seed(db)
+        coalescer = make_coalescer(db, window=1, max_batch=2)
+        await asyncio.gather(
+            *(coalescer.submit(1, f"inv-{i}", 10, 4.0) for i in range(5))
+        )
+        return coalescer.batches, coalescer.flushers
+
+    batches, flushers = run_db(scenario)
+
+    assert batches == [2, 2, 1]
+    assert flushers == {}
+
+
+def test_expired_and_missing_operations_are_rejected(run_db):
+    async def scenario(db):
+        await seed(db, deadline=date(2000, 1, 1))
+        coalescer = make_coalescer(db)
+        return (
+            await outcome(coalescer.submit(1, "inv-a", 10, 4.0)),
+            await outcome(coalescer.submit(2, "inv-a", 10, 4.0)),
+        )
+
+    assert run_db(scenario) == (
+        (400, "Operation expired by date and time"),
+        (404, "Operation not found."),
+    )
@@ -0,0 +1,147 @@
+from datetime import date, datetime
+
+from sqlalchemy import event, func, select
+
+import app.database.crud as crud
+import app.database.sql_models as sql_models
+
+
+async def seed(db):
+    for user_id, role in (
+        ("op-a", "operador"),
+        ("op-b", "operador"),
+        ("inv-x", "inversor"),
+        ("inv-y", "inversor"),
+    ):
+        db.add(
+            sql_models.User(
+                id=user_id,
+                username=user_id,
+                password_hash="x",
+                role=role,
+                created_at=datetime(2024, 1, 1),
+            )
+        )
+    for operation_id, operator_id, collected, is_closed in (
+        (1, "op-a", 300, False),
+        (2, "op-a", 100, True),
+        (3, "op-b", 50, False),
+    ):
+        db.add(
+            sql_models.Operation(
+                id=operation_id,
+                operator_id=operator_id,
+                amount_required=1000,
+                interest_rate=5.0,
+                deadline=date(2100, 1, 1),
+                amount_collected=collected,
+                is_closed=is_closed,
+                created_at=datetime(2024, 1, 1),
+            )
+        )
+    for bid_id, operation_id, investor_id, amount in (
+        (1, 1, "inv-x", 100),
+        (2, 1, "inv-y", 200),
+        (3, 2, "inv-x", 100),
+        (4, 3, "inv-x", 50),
+    ):
+        db.add(
+            sql_models.Bid(
+                id=bid_id,
+                operation_id=operation_id,
+                investor_id=investor_id,
+                amount=amount,
+                interest_rate=4.0,
+                bid_date=datetime(2024, 1, 1),
+            )
+        )
+    await db.commit()
+
+
+async def snapshot(db):
+    db.expire_all()
+    operations = (await db.execute(select(sql_models.Operation))).scalars().all()
+    bids = (await db.execute(select(sql_models.Bid.id))).scalars().all()
+    users = (await db.execute(select(sql_models.User.id))).scalars().all()
+    return (
+        {operation.id: float(operation.amount_collected) for operation in operations},
+        sorted(bids),
+        sorted(users),
+    )
+
+
+# ======================================================
+#              TEST crud.delete_user_by_id
+# ======================================================
+def test_deleting_investor_releases_amounts_on_open_operations(run_db):
+    async def scenario(db):
+        await seed(db)
+        deleted = await crud.delete_user_by_id(db, "inv-x")
+        return deleted, await snapshot(db)
+
+    deleted, (collected, bids, users) = run_db(scenario)
+
+    assert deleted is True
+    assert collected == {1: 200.0, 2: 100.0, 3: 0.0}
+    assert bids == [2]
+    assert "inv-x" not in users
+
+
+def test_deleting_operator_removes_operations_and_their_bids(run_db):
+    async def scenario(db):
+        await seed(db)
+        await crud.delete_user_by_id(db, "op-a")
+        return await snapshot(db)
+
+    collected, bids, users = run_db(scenario)
+
+    assert collected == {3: 50.0}
+    assert bids == [4]
+    assert users == ["inv-x", "inv-y", "op-b"]
+
+
+def test_deleting_missing_user_returns_false(run_db):
+    async def scenario(db):
+        await seed(db)
+        return await crud.delete_user_by_id(db, "nobody")
+
+    assert run_db(scenario) is False
+
+
+# ======================================================
+#            TEST crud.delete_operation_by_id
+# ======================================================
+def test_operation_bids_are_deleted_in_chunks(run_db, monkeypatch):
+    monkeypatch.setattr(crud, "DELETE_CHUNK_SIZE", 3)
+
+    async def scenario(db):
+        await seed(db)
+        for i in range(10):
+            db.add(
+                sql_models.Bid(
+                    operation_id=1,
+                    investor_id="inv-y",
+                    amount=1,
+                    interest_rate=4.0,
+                    bid_date=datetime(2024, 1, 1),
+                )
+            )
+        await db.commit()
+
+        statements = []
+        event.listen(
+            db.bind.sync_engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        deleted = await crud.delete_operation_by_id(db, 1)
+        remaining = await db.scalar(
+            select(func.count())
+            .select_from(sql_models.Bid)
+            .where(sql_models.Bid.operation_id == 1)
+        )
+        deletes = [s for s in statements if s.startswith("DELETE FROM bids")]
+        return deleted, remaining, len(deletes)
+
+    # 12 ofertas en tramos de 3: 4 tramos completos más uno vacío al final
+    assert run_db(scenario) == (True, 0, 5)
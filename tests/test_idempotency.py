@@ -0,0 +1,130 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.responses import JSONResponse
+
+from app.main import app
+from app.utils.idempotency import IdempotencyMiddleware, IdempotencyStore
+from app.utils.token_generator import create_access_token
+
+client = TestClient(app)
+
+token = create_access_token(data={"sub": "operador_test", "role": "operador"})
+
+
+def headers(key):
+    return {"Authorization": f"Bearer {token}", "Idempotency-Key": key}
+
+
+def make_client(store):
+    inner = FastAPI()
+    calls = []
+
+    @inner.post("/bid", status_code=201)
+    async def create_bid(payload: dict):
+        calls.append(payload)
+        await asyncio.sleep(0.05)
+        return {"id": len(calls)}
+
+    @inner.post("/operation")
+    async def create_operation():
+        return JSONResponse({"detail": "busy"}, status_code=503)
+
+    return IdempotencyMiddleware(inner, store), calls
+
+
+# ======================================================
+#      TEST POST /operation con Idempotency-Key
+# ======================================================
+def test_replay_does_not_touch_crud():
+    operation_data = {
+        "amount_required": 1000,
+        "interest_rate": 5,
+        "deadline": "2100-01-01",
+    }
+    mock_user = MagicMock()
+    mock_user.id = "fffbc1d8-e0b2-4789-950e-844f9aa9f623"
+    mock_user.role = "operador"
+
+    with patch(
+        "app.database.crud.get_user_by_username", return_value=mock_user
+    ) as mock_get_user, patch("app.database.crud.create_operation") as mock_create:
+        mock_create.return_value = {
+            "id": 1,
+            "operator_id": mock_user.id,
+            **operation_data,
+            "amount_collected": 0.0,
+            "is_closed": False,
+            "created_at": "2024-10-22T23:23:54.013Z",
+        }
+
+        first = client.post("/operation", json=operation_data, headers=headers("op-1"))
+        second = client.post("/operation", json=operation_data, headers=headers("op-1"))
+
+    assert first.status_code == 201
+    assert second.status_code == 201
+    assert second.json() == first.json()
+    assert second.headers["idempotent-replayed"] == "true"
+    assert mock_create.call_count == 1
+    assert mock_get_user.call_count == 1
+
+
+# ======================================================
+#               TEST IdempotencyMiddleware
+# ======================================================
+def test_key_reused_with_other_body_is_rejected():
+    middleware, calls = make_client(IdempotencyStore())
+    test_client = TestClient(middleware)
+
+    test_client.post("/bid", json={"amount": 1}, headers=headers("k"))
+    response = test_client.post("/bid", json={"amount": 2}, headers=headers("k"))
+
+    assert response.status_code == 422
+    assert len(calls) == 1
+
+
+def test_in_flight_duplicates_wait_for_original():
+    middleware, calls = make_client(IdempotencyStore())
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=middleware)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as test_client:
+            return await asyncio.gather(
+                *(
+                    test_client.post("/bid", json={"amount": 1}, headers=headers("dup"))
+                    for _ in range(5)
+                )
+            )
+
+    responses = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert {r.json()["id"] for r in responses} == {1}
+    assert sum("idempotent-replayed" in r.headers for r in responses) == 4
+
+
+def test_transient_errors_are_not_stored():
+    store = IdempotencyStore()
+    middleware, _ = make_client(store)
+
+    response = TestClient(middleware).post("/operation", headers=headers("busy"))
+
+    assert response.status_code == 503
+    assert not store.entries
+
+
+def test_requests_without_key_are_not_stored():
+    store = IdempotencyStore()
+    middleware, calls = make_client(store)
+    test_client = TestClient(middleware)
+
+    test_client.post("/bid", json={"amount": 1}, headers={"Authorization": "x"})
+    test_client.post("/bid", json={"amount": 1}, headers={"Authorization": "x"})
+
+    assert len(calls) == 2
+    assert not store.entries
@@ -0,0 +1,205 @@
+import asyncio
+import multiprocessing
+import os
+import socket
+import statistics
+import time
+from collections import deque
+from datetime import date, datetime
+
+import app.database.crud as crud
+import app.database.sql_models as sql_models
+import app.utils.invalidation as invalidation
+from app.utils.invalidation import (
+    BID,
+    OPERATION,
+    InProcessBackend,
+    InvalidationBus,
+    UnixSocketBackend,
+)
+from app.utils.operations_index import ActiveOperationsIndex
+
+OPERATOR_ID = "00000000-0000-0000-0000-000000000001"
+WORKERS = 3
+EVENTS = 200
+
+
+async def seed(db):
+    db.add(
+        sql_models.User(
+            id=OPERATOR_ID,
+            username="operador",
+            password_hash="x",
+            role="operador",
+            created_at=datetime(2024, 1, 1),
+        )
+    )
+    db.add(
+        sql_models.Operation(
+            id=1,
+            operator_id=OPERATOR_ID,
+            amount_required=1000,
+            interest_rate=5.0,
+            deadline=date(2100, 1, 1),
+            amount_collected=0,
+            is_closed=False,
+            created_at=datetime(2024, 1, 1),
+        )
+    )
+    await db.commit()
+
+
+def worker(directory, results):
+    # Suscriptor en otro proceso: devuelve la latencia de cada evento recibido
+    async def main():
+        bus = InvalidationBus(UnixSocketBackend(directory))
+        latencies = []
+        done = asyncio.Event()
+
+        def on_operation(event):
+            latencies.append((time.time_ns() - event.version) / 1e9)
+            if len(latencies) == EVENTS:
+                done.set()
+
+        bus.subscribe(OPERATION, on_operation)
+        bus.start()
+        try:
+            await asyncio.wait_for(done.wait(), 20)
+        finally:
+            results.put(latencies)
+            bus.close()
+
+    asyncio.run(main())
+
+
+# ======================================================
+#                 TEST InvalidationBus
+# ======================================================
+def test_in_process_bus_delivers_local_events_by_entity():
+    bus = InvalidationBus(InProcessBackend())
+    received = []
+    bus.subscribe(OPERATION, received.append)
+
+    bus.publish(OPERATION, 7)
+    bus.publish(BID, 3)
+    bus.publish(OPERATION)
+
+    assert [(event.entity_id, event.local) for event in received] == [
+        (7, True),
+        (None, True),
+    ]
+    assert received[0].version < received[1].version
+
+
+def test_unix_bus_invalidates_other_worker_processes(tmp_path):
+    directory = str(tmp_path)
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    workers = [
+        context.Process(target=worker, args=(directory, results))
+        for _ in range(WORKERS)
+    ]
+    for process in workers:
+        process.start()
+
+    async def publish():
+        # Espera a que todos los workers hayan enlazado su socket
+        end = time.monotonic() + 20
+        while len(os.listdir(directory)) < WORKERS and time.monotonic() < end:
+            await asyncio.sleep(0.01)
+        bus = InvalidationBus(UnixSocketBackend(directory))
+        bus.start()
+        for operation_id in range(EVENTS):
+            bus.publish(OPERATION, operation_id)
+            if operation_id % 20 == 0:
+                await asyncio.sleep(0)
+        # Da tiempo a reenviar lo que haya quedado retenido
+        while bus.backend.backlog:
+            await asyncio.sleep(0.01)
+        bus.close()
+
+    asyncio.run(publish())
+    received = [results.get(timeout=30) for _ in workers]
+    for process in workers:
+        process.join(timeout=10)
+
+    latencies = sorted(latency for worker in received for latency in worker)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"\ninvalidation latency over {WORKERS} workers: "
+        f"p50 {statistics.median(latencies) * 1000:.3f} ms, p99 {p99 * 1000:.3f} ms"
+    )
+    assert [len(worker) for worker in received] == [EVENTS] * WORKERS
+    assert p99 < 1.0
+    assert os.listdir(directory) == []
+
+
+def test_unix_backend_removes_sockets_of_dead_workers(tmp_path):
+    stale = tmp_path / "999999-1.sock"
+    dead = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    dead.bind(str(stale))
+    dead.close()
+
+    async def scenario():
+        bus = InvalidationBus(UnixSocketBackend(str(tmp_path)))
+        bus.start()
+        bus.publish(OPERATION, 1)
+        bus.close()
+
+    asyncio.run(scenario())
+    assert not stale.exists()
+
+
+def test_slow_worker_backlog_collapses_into_flush_all(tmp_path, monkeypatch):
+    monkeypatch.setattr(invalidation, "INVALIDATION_BACKLOG", 3)
+    backend = UnixSocketBackend(str(tmp_path))
+    backend.flush_all = lambda: b"flush"
+    backend.backlog["peer"] = deque([b"1"])
+
+    for payload in (b"2", b"3", b"4"):
+        backend._enqueue("peer", backend.backlog["peer"], payload)
+
+    assert list(backend.backlog["peer"]) == [b"flush"]
+    assert backend.overflows == 1
+
+
+# ======================================================
+#         TEST publicación desde crud e índice
+# ======================================================
+def test_crud_writes_publish_entity_events(run_db, monkeypatch):
+    bus = InvalidationBus(InProcessBackend())
+    received = []
+    bus.subscribe(OPERATION, received.append)
+    monkeypatch.setattr(crud, "invalidation_bus", bus)
+
+    async def scenario(db):
+        await seed(db)
+        await crud.update_operation_by_id(db, 1, "interest_rate", 6.0)
+        await crud.update_operation_amount_collected(db, 1, 100)
+        await crud.delete_operation_by_id(db, 1)
+        return [event.entity_id for event in received]
+
+    assert run_db(scenario) == [1, 1, 1]
+
+
+def test_remote_operation_event_refreshes_index_entry(run_db):
+    async def scenario(db):
+        await seed(db)
+        index = ActiveOperationsIndex()
+        await index.listing(db)
+
+        await db.execute(
+            sql_models.Operation.__table__.update().values(amount_collected=400)
+        )
+        await db.commit()
+        local = invalidation.InvalidationEvent(OPERATION, 1, 1, "here", local=True)
+        remote = invalidation.InvalidationEvent(OPERATION, 1, 2, "elsewhere")
+        index.on_invalidation(local)
+        ignored = index.stale.copy()
+        index.on_invalidation(remote)
+        body = await index.listing(db)
+        return ignored, index.stale, body
+
+    ignored, stale, body = run_db(scenario)
+    assert ignored == set() and stale == set()
+    assert b'"amount_collected":400.0' in body
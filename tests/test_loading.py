@@ -0,0 +1,142 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+from sqlalchemy.exc import InvalidRequestError
+
+import app.database.crud as crud
+import app.database.policies as policies
+import app.database.sql_models as sql_models
+from app.main import app
+
+client = TestClient(app)
+
+OPERATOR_ID = "00000000-0000-0000-0000-000000000001"
+INVESTOR_A = SimpleNamespace(id="inv-a", role="inversor")
+INVESTOR_B = SimpleNamespace(id="inv-b", role="inversor")
+OUTSIDER = SimpleNamespace(id="inv-c", role="inversor")
+
+
+async def seed(db):
+    db.add(
+        sql_models.User(
+            id=OPERATOR_ID,
+            username=OPERATOR_ID,
+            password_hash="x",
+            role="operador",
+            created_at=datetime(2024, 1, 1),
+        )
+    )
+    for operation_id in (1, 2):
+        db.add(
+            sql_models.Operation(
+                id=operation_id,
+                operator_id=OPERATOR_ID,
+                amount_required=1000,
+                interest_rate=5.0,
+                deadline=date(2100, 1, 1),
+                amount_collected=0,
+                is_closed=False,
+                created_at=datetime(2024, 1, 1),
+            )
+        )
+    for bid_id, investor, amount, rate in (
+        (1, INVESTOR_A, 100, 4.0),
+        (2, INVESTOR_B, 300, 3.0),
+    ):
+        db.add(
+            sql_models.Bid(
+                id=bid_id,
+                operation_id=1,
+                investor_id=investor.id,
+                amount=amount,
+                interest_rate=rate,
+                bid_date=datetime(2024, 1, 1),
+            )
+        )
+    await db.commit()
+
+
+def count_queries(db):
+    statements = []
+    event.listen(
+        db.bind.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    return statements
+
+
+# ======================================================
+#                TEST relaciones lazy="raise"
+# ======================================================
+def test_relationships_are_not_lazy_loaded(run_db):
+    async def scenario(db):
+        await seed(db)
+        operation = (await db.execute(select(sql_models.Operation))).scalars().first()
+        with pytest.raises(InvalidRequestError):
+            operation.bids
+
+    run_db(scenario)
+
+
+# ======================================================
+#            TEST crud.get_operation_with_bids
+# ======================================================
+def test_operation_with_bids_uses_two_queries_and_policy(run_db):
+    async def scenario(db):
+        await seed(db)
+        statements = count_queries(db)
+        operation = await crud.get_operation_with_bids(
+            db, 1, policies.may_view_operation_bids(INVESTOR_A)
+        )
+        queries = len(statements)
+        db.expunge_all()
+        outsider = await crud.get_operation_with_bids(
+            db, 1, policies.may_view_operation_bids(OUTSIDER)
+        )
+        missing = await crud.get_operation_with_bids(
+            db, 3, policies.may_view_operation_bids(INVESTOR_A)
+        )
+        return operation, queries, outsider, missing
+
+    operation, queries, outsider, missing = run_db(scenario)
+
+    assert [bid.id for bid in operation.bids] == [1, 2]
+    assert queries == 2
+    assert outsider.bids == []
+    assert missing is None
+
+
+# ======================================================
+#      TEST crud.get_active_operations_with_bid_summary
+# ======================================================
+def test_bid_summary_is_computed_in_one_query(run_db):
+    async def scenario(db):
+        await seed(db)
+        statements = count_queries(db)
+        operations = await crud.get_active_operations_with_bid_summary(db)
+        return operations, len(statements)
+
+    operations, queries = run_db(scenario)
+
+    assert queries == 1
+    assert [op.bid_summary.model_dump() for op in operations] == [
+        {"bid_count": 2, "total_amount": 400.0, "avg_interest_rate": 3.5},
+        {"bid_count": 0, "total_amount": 0.0, "avg_interest_rate": None},
+    ]
+
+
+# ======================================================
+#              TEST GET /operation ?include=
+# ======================================================
+def test_include_bids_requires_authentication():
+    response = client.get("/operation/1?include=bids")
+    assert response.status_code == 401
+
+
+def test_unsupported_include_is_rejected():
+    assert client.get("/operation/1?include=users").status_code == 400
+    assert client.get("/operations?include=bids").status_code == 400
@@ -0,0 +1,164 @@
+import json
+from datetime import date, datetime
+
+import app.database.sql_models as sql_models
+import app.models.py_schemas as py_schemas
+import app.utils.operations_index as operations_index_module
+from app.utils.operations_index import ActiveOperationsIndex
+
+OPERATOR_ID = "00000000-0000-0000-0000-000000000001"
+
+
+async def seed(db):
+    db.add(
+        sql_models.User(
+            id=OPERATOR_ID,
+            username="op-1",
+            password_hash="x",
+            role="operador",
+            created_at=datetime(2024, 1, 1),
+        )
+    )
+    for operation_id, rate, deadline, collected, is_closed in (
+        (1, 5.0, date(2100, 3, 1), 0, False),
+        (2, 3.0, date(2100, 1, 1), 900, False),
+        (3, 4.0, date(2100, 2, 1), 500, False),
+        (4, 2.0, date(2100, 1, 1), 0, True),
+    ):
+        db.add(
+            sql_models.Operation(
+                id=operation_id,
+                operator_id=OPERATOR_ID,
+                amount_required=1000,
+                interest_rate=rate,
+                deadline=deadline,
+                amount_collected=collected,
+                is_closed=is_closed,
+                created_at=datetime(2024, 1, 1),
+            )
+        )
+    await db.commit()
+
+
+def ids(body):
+    return [operation["id"] for operation in json.loads(body)]
+
+
+def make_operation(operation_id, **fields):
+    values = {
+        "id": operation_id,
+        "operator_id": OPERATOR_ID,
+        "amount_required": 1000,
+        "interest_rate": 1.0,
+        "deadline": date(2100, 1, 1),
+        "amount_collected": 0,
+        "is_closed": False,
+        "created_at": datetime(2024, 1, 1),
+    }
+    values.update(fields)
+    return py_schemas.Operation(**values)
+
+
+# ======================================================
+#            TEST ActiveOperationsIndex.listing
+# ======================================================
+def test_listing_matches_schema_and_supports_sorts(run_db):
+    async def scenario(db):
+        await seed(db)
+        index = ActiveOperationsIndex()
+        return {
+            sort: await index.listing(db, sort)
+            for sort in ("id", "deadline", "interest_rate", "remaining")
+        }
+
+    bodies = run_db(scenario)
+
+    assert json.loads(bodies["id"])[0] == {
+        "amount_required": 1000.0,
+        "interest_rate": 5.0,
+        "deadline": "2100-03-01",
+        "id": 1,
+        "operator_id": OPERATOR_ID,
+        "amount_collected": 0.0,
+        "is_closed": False,
+        "created_at": "2024-01-01T00:00:00",
+    }
+    assert ids(bodies["id"]) == [1, 2, 3]
+    assert ids(bodies["deadline"]) == [2, 3, 1]
+    assert ids(bodies["interest_rate"]) == [2, 3, 1]
+    assert ids(bodies["remaining"]) == [2, 3, 1]
+
+
+def test_listing_body_is_reused_until_a_change(run_db):
+    async def scenario(db):
+        await seed(db)
+        index = ActiveOperationsIndex()
+        first = await index.listing(db)
+        second = await index.listing(db)
+        index.upsert(make_operation(5))
+        third = await index.listing(db)
+        return first is second, ids(third)
+
+    assert run_db(scenario) == (True, [1, 2, 3, 5])
+
+
+# ======================================================
+#             TEST cambios incrementales
+# ======================================================
+def test_incremental_changes_keep_sorted_views(run_db):
+    async def scenario(db):
+        await seed(db)
+        index = ActiveOperationsIndex()
+        await index.listing(db)
+
+        index.update_funding(1, 950, False)  # ahora es la de menor monto restante
+        index.update_funding(2, 1000, True)  # se cierra y sale del listado
+        index.discard(3)
+        index.upsert(make_operation(6, interest_rate=0.5))
+        return (
+            ids(await index.listing(db, "remaining")),
+            ids(await index.listing(db, "interest_rate")),
+            sum(len(keys) for keys in index.sorted_keys.values()),
+        )
+
+    assert run_db(scenario) == ([1, 6], [6, 1], 8)
+
+
+def test_expired_operations_leave_the_listing_when_the_day_changes(run_db, monkeypatch):
+    async def scenario(db):
+        await seed(db)
+        index = ActiveOperationsIndex()
+        before = ids(await index.listing(db))
+        monkeypatch.setattr(
+            operations_index_module, "_today", lambda: date(2100, 1, 15)
+        )
+        after = ids(await index.listing(db, "deadline"))
+        return before, after
+
+    assert run_db(scenario) == ([1, 2, 3], [3, 1])
+
+
+def test_changes_before_loading_are_ignored_and_invalidate_reloads(run_db):
+    async def scenario(db):
+        await seed(db)
+        index = ActiveOperationsIndex()
+        index.upsert(make_operation(7))  # sin cargar: la carga leerá la base de datos
+        loaded = ids(await index.listing(db))
+        index.invalidate()
+        reloaded = ids(await index.listing(db))
+        return loaded, reloaded
+
+    assert run_db(scenario) == ([1, 2, 3], [1, 2, 3])
+
+
+def test_pages_are_slices_of_the_sorted_listing(run_db):
+    async def scenario(db):
+        await seed(db)
+        index = ActiveOperationsIndex()
+        return (
+            ids(await index.listing(db, "deadline", 1, 1)),
+            ids(await index.listing(db, "deadline", 1)),
+            ids(await index.listing(db, "deadline", 5, 10)),
+        )
+
+    assert run_db(scenario) == ([3], [3, 1], [])
@@ -0,0 +1,171 @@
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import delete, event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+import app.database.crud as crud
+import app.database.policies as policies
+import app.database.sql_models as sql_models
+import app.models.py_schemas as py_schemas
+from app.database.bid_coalescer import BidCoalescer
+
+OPERATOR = SimpleNamespace(id="00000000-0000-0000-0000-000000000001", role="operador")
+INVESTOR = SimpleNamespace(id="00000000-0000-0000-0000-000000000002", role="inversor")
+
+
+async def seed_users(db):
+    for user in (OPERATOR, INVESTOR):
+        db.add(
+            sql_models.User(
+                id=user.id,
+                username=user.id,
+                password_hash="x",
+                role=user.role,
+                created_at=datetime(2024, 1, 1),
+            )
+        )
+    await db.commit()
+
+
+async def create_operation(db, amount_required, deadline):
+    return await crud.create_operation(
+        db,
+        py_schemas.OperationCreate(
+            amount_required=amount_required, interest_rate=5.0, deadline=deadline
+        ),
+        OPERATOR,
+    )
+
+
+async def summary(db):
+    dashboard = await crud.get_operator_dashboard(db, OPERATOR.id)
+    values = dashboard.summary.model_dump()
+    return (
+        values["operation_count"],
+        values["open_operation_count"],
+        values["amount_required_total"],
+        values["amount_collected_total"],
+        values["bid_count"],
+    )
+
+
+# ======================================================
+#         TEST resumen materializado por operador
+# ======================================================
+def test_summary_follows_every_write(run_db):
+    async def scenario(db):
+        await seed_users(db)
+        steps = []
+
+        first_id = (await create_operation(db, 1000, date(2100, 1, 1))).id
+        second_id = (await create_operation(db, 500, date(2100, 2, 1))).id
+        steps.append(await summary(db))
+
+        coalescer = BidCoalescer(sessionmaker(bind=db.bind, class_=AsyncSession))
+        bid = await coalescer.submit(second_id, INVESTOR.id, 300, 4.0)
+        steps.append(await summary(db))
+
+        await crud.update_bid_fields(
+            db,
+            bid.id,
+            py_schemas.BidUpdate(amount=200),
+            policies.may_manage_bid(INVESTOR),
+        )
+        steps.append(await summary(db))
+
+        await crud.update_operation_amount_collected(
+            db, second_id, 200, is_addition=False
+        )
+        await crud.delete_bid_by_id(db, bid.id)
+        steps.append(await summary(db))
+
+        await crud.delete_operation_by_id(db, first_id)
+        steps.append(await summary(db))
+        return steps
+
+    assert run_db(scenario) == [
+        (2, 2, 1500.0, 0.0, 0),
+        (2, 2, 1500.0, 300.0, 1),
+        (2, 2, 1500.0, 200.0, 1),
+        (2, 2, 1500.0, 0.0, 0),
+        (1, 1, 500.0, 0.0, 0),
+    ]
+
+
+def test_deleting_operator_removes_its_summary(run_db):
+    async def scenario(db):
+        await seed_users(db)
+        await create_operation(db, 1000, date(2100, 1, 1))
+        await crud.delete_user_by_id(db, OPERATOR.id)
+        return await db.get(sql_models.OperatorSummary, OPERATOR.id)
+
+    assert run_db(scenario) is None
+
+
+# ======================================================
+#            TEST crud.get_operator_dashboard
+# ======================================================
+def test_dashboard_is_one_query_with_open_operations_first(run_db):
+    async def scenario(db):
+        await seed_users(db)
+        today = datetime.now(timezone.utc).date()
+        late = (await create_operation(db, 1000, today + timedelta(days=30))).id
+        soon = (await create_operation(db, 400, today + timedelta(days=3))).id
+        closed = (await create_operation(db, 100, today + timedelta(days=1))).id
+        coalescer = BidCoalescer(sessionmaker(bind=db.bind, class_=AsyncSession))
+        await coalescer.submit(soon, INVESTOR.id, 100, 4.0)
+        # Completa la operación y la cierra
+        await coalescer.submit(closed, INVESTOR.id, 100, 4.0)
+
+        statements = []
+        event.listen(
+            db.bind.sync_engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        dashboard = await crud.get_operator_dashboard(db, OPERATOR.id)
+        page = await crud.get_operator_dashboard(db, OPERATOR.id, offset=1, limit=1)
+        return dashboard, page, len(statements), (late, soon, closed)
+
+    dashboard, page, queries, (late, soon, closed) = run_db(scenario)
+
+    assert queries == 2
+    assert [
+        (op.id, op.is_closed, op.bid_count, op.fill_ratio, op.days_to_deadline)
+        for op in dashboard.operations
+    ] == [
+        (soon, False, 1, 0.25, 3),
+        (late, False, 0, 0.0, 30),
+        (closed, True, 1, 1.0, 1),
+    ]
+    assert dashboard.summary.open_operation_count == 2
+    assert dashboard.summary.fill_ratio == 200 / 1500
+    assert [op.id for op in page.operations] == [late]
+    assert page.summary == dashboard.summary
+
+
+def test_missing_summary_is_rebuilt_on_read(run_db):
+    async def scenario(db):
+        await seed_users(db)
+        await create_operation(db, 1000, date(2100, 1, 1))
+        await db.execute(delete(sql_models.OperatorSummary))
+        await db.commit()
+        return await summary(db)
+
+    assert run_db(scenario) == (1, 1, 1000.0, 0.0, 0)
+
+
+def test_dashboard_lookup_uses_operator_index(run_db):
+    async def scenario(db):
+        result = await db.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT * FROM operations WHERE operator_id = :op "
+                "ORDER BY is_closed, deadline"
+            ),
+            {"op": OPERATOR.id},
+        )
+        return " ".join(str(row) for row in result)
+
+    assert "idx_operations_operator_closed_deadline" in run_db(scenario)
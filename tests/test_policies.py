@@ -0,0 +1,128 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import app.database.crud as crud
+import app.database.policies as policies
+import app.database.sql_models as sql_models
+
+OPERATOR = SimpleNamespace(id="op-1", role="operador")
+INVESTOR_A = SimpleNamespace(id="inv-a", role="inversor")
+INVESTOR_B = SimpleNamespace(id="inv-b", role="inversor")
+OUTSIDER = SimpleNamespace(id="inv-c", role="inversor")
+
+
+async def seed(db):
+    for user in (OPERATOR, INVESTOR_A, INVESTOR_B, OUTSIDER):
+        db.add(
+            sql_models.User(
+                id=user.id,
+                username=user.id,
+                password_hash="x",
+                role=user.role,
+                created_at=datetime(2024, 1, 1),
+            )
+        )
+    db.add(
+        sql_models.Operation(
+            id=1,
+            operator_id=OPERATOR.id,
+            amount_required=1000,
+            interest_rate=5.0,
+            deadline=date(2100, 1, 1),
+            amount_collected=300,
+            is_closed=False,
+            created_at=datetime(2024, 1, 1),
+        )
+    )
+    for bid_id, investor in ((1, INVESTOR_A), (2, INVESTOR_B)):
+        db.add(
+            sql_models.Bid(
+                id=bid_id,
+                operation_id=1,
+                investor_id=investor.id,
+                amount=150,
+                interest_rate=4.0,
+                bid_date=datetime(2024, 1, 1),
+            )
+        )
+    await db.commit()
+
+
+# ======================================================
+#        TEST policies.may_view_operation_bids
+# ======================================================
+def test_investor_with_bid_sees_all_bids(run_db):
+    async def scenario(db):
+        await seed(db)
+        policy = policies.may_view_operation_bids(INVESTOR_A)
+        return await crud.get_bids_by_operation_id(db, 1, policy=policy)
+
+    bids = run_db(scenario)
+    assert [bid.id for bid in bids] == [1, 2]
+
+
+def test_outsider_gets_empty_page_and_forbidden_access(run_db):
+    async def scenario(db):
+        await seed(db)
+        policy = policies.may_view_operation_bids(OUTSIDER)
+        bids = await crud.get_bids_by_operation_id(db, 1, policy=policy)
+        access = await crud.get_operation_bids_access(db, 1, policy)
+        return bids, access
+
+    bids, access = run_db(scenario)
+    assert bids == []
+    assert access == (True, False)
+
+
+def test_operation_without_bids_is_not_found(run_db):
+    async def scenario(db):
+        await seed(db)
+        policy = policies.may_view_operation_bids(INVESTOR_A)
+        return await crud.get_operation_bids_access(db, 99, policy)
+
+    assert run_db(scenario) == (False, False)
+
+
+def test_bids_page_is_limited(run_db):
+    async def scenario(db):
+        await seed(db)
+        policy = policies.may_view_operation_bids(INVESTOR_B)
+        return await crud.get_bids_by_operation_id(
+            db, 1, policy=policy, offset=1, limit=1
+        )
+
+    assert [bid.id for bid in run_db(scenario)] == [2]
+
+
+# ======================================================
+#      TEST policies.may_manage_bid / may_manage_operation
+# ======================================================
+def test_bid_access_is_resolved_in_query(run_db):
+    async def scenario(db):
+        await seed(db)
+        owner = await crud.get_bid_with_access(
+            db, 1, policies.may_manage_bid(INVESTOR_A)
+        )
+        other = await crud.get_bid_with_access(
+            db, 1, policies.may_manage_bid(INVESTOR_B)
+        )
+        missing = await crud.get_bid_with_access(
+            db, 99, policies.may_manage_bid(INVESTOR_A)
+        )
+        return owner[1], other[1], missing
+
+    assert run_db(scenario) == (True, False, None)
+
+
+def test_operation_access_requires_owner_operator(run_db):
+    async def scenario(db):
+        await seed(db)
+        owner = await crud.get_operation_with_access(
+            db, 1, policies.may_manage_operation(OPERATOR)
+        )
+        investor = await crud.get_operation_with_access(
+            db, 1, policies.may_manage_operation(INVESTOR_A)
+        )
+        return owner[1], investor[1]
+
+    assert run_db(scenario) == (True, False)
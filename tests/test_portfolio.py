@@ -0,0 +1,126 @@
+from datetime import date, datetime
+
+from sqlalchemy import event, text
+
+import app.database.crud as crud
+import app.database.sql_models as sql_models
+
+OPERATOR_ID = "00000000-0000-0000-0000-000000000001"
+INVESTOR_ID = "00000000-0000-0000-0000-000000000002"
+OTHER_ID = "00000000-0000-0000-0000-000000000003"
+
+
+async def seed(db):
+    for user_id, role in (
+        (OPERATOR_ID, "operador"),
+        (INVESTOR_ID, "inversor"),
+        (OTHER_ID, "inversor"),
+    ):
+        db.add(
+            sql_models.User(
+                id=user_id,
+                username=user_id,
+                password_hash="x",
+                role=role,
+                created_at=datetime(2024, 1, 1),
+            )
+        )
+    for operation_id, is_closed in ((1, False), (2, True), (3, False)):
+        db.add(
+            sql_models.Operation(
+                id=operation_id,
+                operator_id=OPERATOR_ID,
+                amount_required=1000,
+                interest_rate=5.0,
+                deadline=date(2100, 1, operation_id),
+                amount_collected=0,
+                is_closed=is_closed,
+                created_at=datetime(2024, 1, 1),
+            )
+        )
+    for bid_id, operation_id, investor_id, amount, rate, day in (
+        (1, 1, INVESTOR_ID, 100, 4.0, 3),
+        (2, 2, INVESTOR_ID, 300, 6.0, 1),
+        (3, 3, INVESTOR_ID, 100, 2.0, 2),
+        (4, 1, OTHER_ID, 900, 9.0, 4),
+    ):
+        db.add(
+            sql_models.Bid(
+                id=bid_id,
+                operation_id=operation_id,
+                investor_id=investor_id,
+                amount=amount,
+                interest_rate=rate,
+                bid_date=datetime(2024, 1, day),
+            )
+        )
+    await db.commit()
+
+
+# ======================================================
+#             TEST crud.get_investor_portfolio
+# ======================================================
+def test_portfolio_lists_own_bids_newest_first_with_totals(run_db):
+    async def scenario(db):
+        await seed(db)
+        statements = []
+        event.listen(
+            db.bind.sync_engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        portfolio = await crud.get_investor_portfolio(db, INVESTOR_ID)
+        return portfolio, len(statements)
+
+    portfolio, queries = run_db(scenario)
+
+    assert queries == 2
+    assert [(bid.id, bid.operation_is_closed) for bid in portfolio.bids] == [
+        (1, False),
+        (3, False),
+        (2, True),
+    ]
+    assert portfolio.bids[0].operation_deadline == date(2100, 1, 1)
+    assert portfolio.totals.model_dump() == {
+        "bid_count": 3,
+        "committed_amount": 500.0,
+        "weighted_interest_rate": 4.8,
+        "open_amount": 200.0,
+        "closed_amount": 300.0,
+    }
+
+
+def test_portfolio_pages_bids_but_totals_cover_everything(run_db):
+    async def scenario(db):
+        await seed(db)
+        page = await crud.get_investor_portfolio(db, INVESTOR_ID, offset=1, limit=1)
+        empty = await crud.get_investor_portfolio(db, OPERATOR_ID)
+        return page, empty
+
+    page, empty = run_db(scenario)
+
+    assert [bid.id for bid in page.bids] == [3]
+    assert page.totals.bid_count == 3
+    assert empty.bids == []
+    assert empty.totals.model_dump() == {
+        "bid_count": 0,
+        "committed_amount": 0.0,
+        "weighted_interest_rate": None,
+        "open_amount": 0.0,
+        "closed_amount": 0.0,
+    }
+
+
+def test_portfolio_lookup_uses_investor_index(run_db):
+    async def scenario(db):
+        await seed(db)
+        result = await db.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT * FROM bids WHERE investor_id = :investor "
+                "ORDER BY bid_date DESC"
+            ),
+            {"investor": INVESTOR_ID},
+        )
+        return " ".join(str(row) for row in result)
+
+    assert "idx_bids_investor_bid_date" in run_db(scenario)
@@ -0,0 +1,26 @@
+import app.database.crud as crud
+from app.database import statement_stats
+
+
+# ======================================================
+#     TEST caché de sentencias en las consultas de crud
+# ======================================================
+def test_hot_queries_compile_once_and_then_hit_cache(run_db):
+    async def scenario(db):
+        statement_stats.install(db.bind.sync_engine)
+        statement_stats.reset_statement_stats()
+        for username in ("a", "b", "c"):
+            await crud.get_user_by_username(db, username)
+        for operation_id in (1, 2, 3):
+            await crud.get_operation_by_id(db, operation_id)
+        for investor_id in ("a", "b", "c"):
+            await crud.get_bid_by_investor_and_operation(db, investor_id, 1)
+        return statement_stats.get_statement_stats()
+
+    stats = run_db(scenario)
+
+    assert len(stats) == 3
+    for statement in stats.values():
+        assert statement["executions"] == 3
+        assert statement["compilations"] <= 1
+        assert statement["cache_hits"] >= 2
@@ -0,0 +1,179 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from sqlalchemy import select
+
+import app.database.crud as crud
+import app.database.policies as policies
+import app.database.sql_models as sql_models
+import app.models.py_schemas as py_schemas
+
+OPERATOR = SimpleNamespace(id="00000000-0000-0000-0000-000000000001", role="operador")
+INVESTOR = SimpleNamespace(id="00000000-0000-0000-0000-000000000002", role="inversor")
+OTHER = SimpleNamespace(id="00000000-0000-0000-0000-000000000003", role="inversor")
+
+
+async def seed(db, is_closed=False):
+    for user in (OPERATOR, INVESTOR, OTHER):
+        db.add(
+            sql_models.User(
+                id=user.id,
+                username=user.id,
+                password_hash="x",
+                role=user.role,
+                created_at=datetime(2024, 1, 1),
+            )
+        )
+    db.add(
+        sql_models.Operation(
+            id=1,
+            operator_id=OPERATOR.id,
+            amount_required=1000,
+            interest_rate=5.0,
+            deadline=date(2100, 1, 1),
+            amount_collected=500,
+            is_closed=is_closed,
+            created_at=datetime(2024, 1, 1),
+        )
+    )
+    db.add(
+        sql_models.Bid(
+            id=1,
+            operation_id=1,
+            investor_id=INVESTOR.id,
+            amount=500,
+            interest_rate=4.0,
+            bid_date=datetime(2024, 1, 1),
+        )
+    )
+    await db.commit()
+
+
+async def state(db):
+    db.expire_all()
+    operation = (await db.execute(select(sql_models.Operation))).scalar_one()
+    bid = (await db.execute(select(sql_models.Bid))).scalar_one()
+    return float(operation.amount_collected), operation.is_closed, float(bid.amount)
+
+
+# ======================================================
+#               TEST crud.update_bid_fields
+# ======================================================
+def test_bid_amendment_adjusts_amount_collected(run_db):
+    async def scenario(db):
+        await seed(db)
+        bid = await crud.update_bid_fields(
+            db,
+            1,
+            py_schemas.BidUpdate(amount=300, interest_rate=3.5),
+            policies.may_manage_bid(INVESTOR),
+        )
+        return bid, await state(db)
+
+    bid, current = run_db(scenario)
+    assert float(bid.amount) == 300 and float(bid.interest_rate) == 3.5
+    assert current == (300.0, False, 300.0)
+
+
+def test_bid_amendment_that_fills_operation_closes_it(run_db):
+    async def scenario(db):
+        await seed(db)
+        await crud.update_bid_fields(
+            db, 1, py_schemas.BidUpdate(amount=1000), policies.may_manage_bid(INVESTOR)
+        )
+        return await state(db)
+
+    assert run_db(scenario) == (1000.0, True, 1000.0)
+
+
+def test_bid_amendment_keeps_cap_invariant(run_db):
+    async def scenario(db):
+        await seed(db)
+        bid = await crud.update_bid_fields(
+            db, 1, py_schemas.BidUpdate(amount=1001), policies.may_manage_bid(INVESTOR)
+        )
+        return bid, await state(db)
+
+    assert run_db(scenario) == (None, (500.0, False, 500.0))
+
+
+def test_bid_amendment_requires_owner_and_open_operation(run_db):
+    async def scenario(db, is_closed, user):
+        await seed(db, is_closed=is_closed)
+        bid = await crud.update_bid_fields(
+            db, 1, py_schemas.BidUpdate(interest_rate=1), policies.may_manage_bid(user)
+        )
+        return bid, await state(db)
+
+    assert run_db(lambda db: scenario(db, False, OTHER)) == (
+        None,
+        (500.0, False, 500.0),
+    )
+    assert run_db(lambda db: scenario(db, True, INVESTOR)) == (
+        None,
+        (500.0, True, 500.0),
+    )
+
+
+# ======================================================
+#            TEST crud.update_operation_fields
+# ======================================================
+def test_operation_update_applies_all_fields_for_owner(run_db):
+    async def scenario(db):
+        await seed(db)
+        return await crud.update_operation_fields(
+            db,
+            1,
+            py_schemas.OperationUpdate(amount_required=800, interest_rate=6.0),
+            policies.may_manage_operation(OPERATOR),
+        )
+
+    operation = run_db(scenario)
+    assert (operation.amount_required, operation.interest_rate) == (800.0, 6.0)
+
+
+def test_operation_update_rejects_non_owner_and_low_amount(run_db):
+    async def scenario(db):
+        await seed(db)
+        other = await crud.update_operation_fields(
+            db,
+            1,
+            py_schemas.OperationUpdate(interest_rate=1.0),
+            policies.may_manage_operation(INVESTOR),
+        )
+        too_low = await crud.update_operation_fields(
+            db,
+            1,
+            py_schemas.OperationUpdate(amount_required=100),
+            policies.may_manage_operation(OPERATOR),
+        )
+        return other, too_low
+
+    assert run_db(scenario) == (None, None)
+
+
+# ======================================================
+#              TEST crud.update_user_fields
+# ======================================================
+def test_user_update_hashes_password_and_is_limited_to_self(run_db):
+    async def scenario(db):
+        await seed(db)
+        own = await crud.update_user_fields(
+            db,
+            INVESTOR.id,
+            py_schemas.UserUpdate(username="nuevo", password="secreta"),
+            policies.may_manage_user(INVESTOR),
+        )
+        other = await crud.update_user_fields(
+            db,
+            OPERATOR.id,
+            py_schemas.UserUpdate(username="robado"),
+            policies.may_manage_user(INVESTOR),
+        )
+        user = await crud.get_user_by_id(db, INVESTOR.id)
+        return own, other, user.password_hash
+
+    own, other, password_hash = run_db(scenario)
+    assert own.username == "nuevo"
+    assert other is None
+    assert crud.pwd_context.verify("secreta", password_hash)
@@ -207,3 +207,59 @@ def test_login_user_not_found():
 
         assert response.status_code == 401
         assert response.json() == {"detail": "Invalid username or password."}
+
+
+# ======================================================
+#             TEST PATCH /user/{user_id}
+# ======================================================
+def auth_headers():
+    from app.utils.token_generator import create_access_token
+
+    token = create_access_token(data={"sub": "operador_test", "role": "operador"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_update_user_success():
+    user_id = "fffbc1d8-e0b2-4789-950e-844f9aa9f623"
+    updated_user = {
+        "username": "operador_nuevo",
+        "role": "operador",
+        "id": user_id,
+        "created_at": "2024-10-22T23:23:54.013000Z",
+    }
+
+    with patch("app.database.crud.get_user_by_username", return_value=MagicMock()):
+        with patch("app.database.crud.update_user_fields", return_value=updated_user):
+            response = client.patch(
+                f"/user/{user_id}",
+                json={"username": "operador_nuevo"},
+                headers=auth_headers(),
+            )
+            assert response.status_code == 200
+            assert response.json() == updated_user
+
+
+def test_update_user_not_found():
+    with patch("app.database.crud.get_user_by_username", return_value=MagicMock()):
+        with patch("app.database.crud.update_user_fields", return_value=None):
+            with patch("app.database.crud.get_user_by_id", return_value=None):
+                response = client.patch(
+                    "/user/invalid_user_id", json={"role": "inversor"}, headers=auth_headers()
+                )
+                assert response.status_code == 404
+                assert response.json() == {"detail": "User not found."}
+
+
+def test_update_user_forbidden():
+    user_id = "fffbc1d8-e0b2-4789-950e-844f9aa9f623"
+
+    with patch("app.database.crud.get_user_by_username", return_value=MagicMock()):
+        with patch("app.database.crud.update_user_fields", return_value=None):
+            with patch("app.database.crud.get_user_by_id", return_value={"id": user_id}):
+                response = client.patch(
+                    f"/user/{user_id}", json={"role": "inversor"}, headers=auth_headers()
+                )
+                assert response.status_code == 403
+                assert response.json() == {
+                    "detail": "You do not have permission to update this user."
+                }
@@ -0,0 +1,108 @@
+import asyncio
+from datetime import date, datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+import app.routers.health as health
+import app.database.sql_models as sql_models
+import app.utils.warmup as warmup_module
+from app.database.database import Base
+from app.main import app
+from app.utils.operations_index import ActiveOperationsIndex
+from app.utils.warmup import Warmup
+
+OPERATOR_ID = "00000000-0000-0000-0000-000000000001"
+
+
+async def warm(tmp_path, warmup, index):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/warmup.db",
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=3,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession)
+    async with session_factory() as db:
+        db.add(
+            sql_models.User(
+                id=OPERATOR_ID,
+                username="operador",
+                password_hash="x",
+                role="operador",
+                created_at=datetime(2024, 1, 1),
+            )
+        )
+        db.add(
+            sql_models.Operation(
+                id=1,
+                operator_id=OPERATOR_ID,
+                amount_required=1000,
+                interest_rate=5.0,
+                deadline=date(2100, 1, 1),
+                amount_collected=0,
+                is_closed=False,
+                created_at=datetime(2024, 1, 1),
+            )
+        )
+        await db.commit()
+    await engine.dispose()
+
+    try:
+        await warmup.run(app, engine, session_factory, 3)
+        return engine.pool.checkedin(), len(engine.sync_engine._compiled_cache)
+    finally:
+        await engine.dispose()
+
+
+# ======================================================
+#                    TEST Warmup
+# ======================================================
+def test_warmup_fills_pool_statement_cache_and_index(tmp_path, monkeypatch):
+    index = ActiveOperationsIndex()
+    monkeypatch.setattr(warmup_module, "operations_index", index)
+    warmup = Warmup(enabled=True)
+
+    pooled, compiled = asyncio.run(warm(tmp_path, warmup, index))
+
+    assert warmup.ready and warmup.error is None
+    assert list(warmup.timings) == [
+        "pool",
+        "statements",
+        "schemas",
+        "operations_index",
+        "bcrypt",
+    ]
+    assert pooled == 3
+    assert compiled >= 7
+    assert index.loaded and list(index.entries) == [1]
+    assert app.openapi_schema is not None
+
+
+def test_disabled_warmup_is_ready_immediately():
+    warmup = Warmup(enabled=False)
+    warmup.start(app, None, None)
+    assert warmup.ready and warmup.task is None
+
+
+# ======================================================
+#               TEST GET /health/ready
+# ======================================================
+def test_readiness_reports_unavailable_until_warmup_completes(tmp_path, monkeypatch):
+    monkeypatch.setattr(warmup_module, "operations_index", ActiveOperationsIndex())
+    warmup = Warmup(enabled=True)
+    monkeypatch.setattr(health, "warmup", warmup)
+    client = TestClient(app)
+
+    cold = client.get("/health/ready")
+    asyncio.run(warm(tmp_path, warmup, None))
+    warm_response = client.get("/health/ready")
+
+    assert cold.status_code == 503
+    assert cold.json()["status"] == "warming_up"
+    assert warm_response.status_code == 200
+    assert warm_response.json()["status"] == "ready"
+    assert client.get("/health/live").status_code == 200